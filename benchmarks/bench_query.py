@@ -0,0 +1,126 @@
+"""Бенчмарк сервиса запросов чтения на синтетической коллекции
+
+    docker compose -f benchmarks/docker-compose.yaml up -d
+    python benchmarks/bench_query.py --products 500000
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.settings import settings
+from src.repository.mongo_client import mongo_client
+
+WORDS = [
+    'гипсокартон', 'профиль', 'саморез', 'шпаклевка', 'грунтовка', 'утеплитель', 'кирпич', 'цемент',
+    'плитка', 'ламинат', 'краска', 'эмаль', 'герметик', 'пена', 'клей', 'доска', 'брус', 'фанера',
+    'влагостойкий', 'огнестойкий', 'белый', 'серый', 'универсальный', 'фасадный', 'интерьерный',
+]
+
+
+def synthetic_product(number: int) -> dict:
+    title = ' '.join(random.choice(WORDS) for _ in range(4))
+    return {
+        'article': str(100000 + number),
+        'title': title,
+        'description': ' '.join(random.choice(WORDS) for _ in range(30)),
+        'brand': f'Бренд {random.randint(1, 200)}',
+        'category': f'Категория {random.randint(1, 50)}',
+        'min_price': round(random.uniform(10, 20000), 2),
+        'attributes': [{'k': 'tolshchina', 'v': random.choice([6.5, 9.5, 12.5, 15]), 'u': 'мм'}],
+        'suppliers': [{'dealer_id': 'petrovich', 'supplier_offers': []}],
+    }
+
+
+async def populate(collection, total: int, batch: int = 5000):
+    existing = await collection.estimated_document_count()
+    if existing >= total:
+        print(f'Коллекция уже содержит {existing} документов')
+        return
+
+    started = time.perf_counter()
+    for offset in range(existing, total, batch):
+        await collection.insert_many([synthetic_product(n) for n in range(offset, min(offset + batch, total))])
+    print(f'Сгенерировано {total - existing} документов за {time.perf_counter() - started:.1f} с')
+
+
+async def measure(name: str, call, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) > 1 else timings[0]
+    print(f'{name:<48} p50 {statistics.median(timings):8.2f} мс   p95 {p95:8.2f} мс')
+
+
+async def main(args):
+    settings.collection_name = args.collection
+
+    # Импорт после подмены коллекции: репозитории читают имя из настроек
+    from src.query.query_service import CatalogQueryService
+
+    service = CatalogQueryService()
+    await mongo_client.connect()
+    collection = service.repository.collection
+
+    try:
+        await populate(collection, args.products)
+        await service.repository.ensure_indexes()
+
+        article = str(100000 + args.products // 2)
+        filters = dict(category='Категория 7', min_price=1000, max_price=5000)
+
+        await measure('Артикул, без кэша', lambda: (service.cache.clear(), service.get_by_article(article))[1], args.repeat)
+        await measure('Артикул, из кэша', lambda: service.get_by_article(article), args.repeat)
+
+        async def walk_keyset():
+            page = await service.list_products(**filters, limit=50)
+            for _ in range(args.pages - 1):
+                if not page.next_cursor:
+                    break
+                page = await service.list_products(**filters, cursor=page.next_cursor, limit=50)
+
+        async def walk_skip():
+            query = {'category': filters['category'], 'min_price': {'$gte': 1000, '$lte': 5000}}
+            for page_number in range(args.pages):
+                await collection.find(query, sort=[('min_price', 1), ('_id', 1)],
+                                      skip=page_number * 50, limit=50).to_list(length=50)
+
+        async def walk_search():
+            page = await service.search('влагостойкий гипсокартон', limit=50)
+            for _ in range(args.pages - 1):
+                if not page.next_cursor:
+                    break
+                page = await service.search('влагостойкий гипсокартон', cursor=page.next_cursor, limit=50)
+
+        service.cache.clear()
+        await measure(f'Листинг, {args.pages} стр., keyset, без кэша', lambda: (service.cache.clear(), walk_keyset())[1], 3)
+        await measure(f'Листинг, {args.pages} стр., keyset, из кэша', walk_keyset, 3)
+        await measure(f'Листинг, {args.pages} стр., skip/limit', walk_skip, 3)
+        await measure(f'Поиск, {args.pages} стр., без кэша', lambda: (service.cache.clear(), walk_search())[1], 3)
+        await measure(f'Поиск, {args.pages} стр., из кэша', walk_search, 3)
+
+        print(f'Кэш: попаданий {service.cache.hits}, промахов {service.cache.misses}')
+
+    finally:
+        if args.drop:
+            await collection.drop()
+        await mongo_client.disconnect()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Бенчмарк запросов чтения')
+    parser.add_argument('--products', type=int, default=200000)
+    parser.add_argument('--collection', default='bench_products')
+    parser.add_argument('--pages', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--drop', action='store_true', help='Удалить коллекцию после замера')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,102 @@
+"""Бенчмарк времени запуска: время импорта точек входа по python -X importtime
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 10 --top 15
+
+Каждая точка входа импортируется в отдельном процессе; берется медиана
+по повторам. Если медиана превышает бюджет, скрипт завершается с кодом 1.
+"""
+import os
+import re
+import sys
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Модуль точки входа и бюджет на его импорт в миллисекундах
+TARGETS = {
+    'main': 200,
+    'src.core.settings': 400,
+    'src.services.parser_service': 800,
+    'src.services.worker_service': 1000,
+    'src.services.export_service': 800,
+    'src.query.query_service': 800,
+}
+
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def measure(module: str) -> Tuple[float, Dict[str, int]]:
+    """Импортирует модуль в новом процессе: общее время (мс) и накопленное время по модулям (мкс)"""
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Импорт {module} завершился ошибкой:\n{result.stderr}")
+
+    total = 0
+    cumulative = {}
+
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+
+        _, spent, indent, name = match.groups()
+        cumulative[name] = int(spent)
+        # Верхний уровень — модули, импортированные непосредственно при запуске
+        if not indent:
+            total += int(spent)
+
+    return total / 1000, cumulative
+
+
+def report(module: str, budget: float, repeat: int, top: int) -> bool:
+    runs: List[float] = []
+    cumulative = {}
+
+    for _ in range(repeat):
+        total, cumulative = measure(module)
+        runs.append(total)
+
+    median = statistics.median(runs)
+    ok = median <= budget
+    status = 'OK' if ok else 'ПРЕВЫШЕН'
+
+    print(f"{module:32} медиана {median:7.1f} мс, бюджет {budget:6.0f} мс  {status}")
+
+    if top:
+        heaviest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:top]
+        for name, spent in heaviest:
+            print(f"    {spent / 1000:7.1f} мс  {name}")
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Время импорта точек входа")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=0, help="Показать самые тяжелые импорты")
+    parser.add_argument('--scale', type=float, default=1.0, help="Множитель бюджетов для медленных машин")
+    parser.add_argument('modules', nargs='*', help="Модули (по умолчанию — все точки входа)")
+    args = parser.parse_args()
+
+    modules = args.modules or list(TARGETS)
+    results = [
+        report(module, TARGETS.get(module, 1000) * args.scale, args.repeat, args.top)
+        for module in modules
+    ]
+
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
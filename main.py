@@ -1,6 +1,10 @@
+import sys
 import asyncio
 import logging
-from src.services.parser_service import ParserService
+import argparse
+
+# Сервисы импортируются внутри веток команд: каждая загружает только нужные ей
+# парсеры, HTTP-клиент и драйвер MongoDB
 
 
 def setup_logging():
@@ -15,23 +19,125 @@ def setup_logging():
     )
 
 
-async def main():
+def parse_args(argv=None):
+    """Разбор аргументов командной строки"""
+
+    parser = argparse.ArgumentParser(description="Парсер товаров с сайта Петрович")
+    subparsers = parser.add_subparsers(dest="command")
+
+    subparsers.add_parser("crawl", help="Полный парсинг сайта (по умолчанию)")
+    worker_parser = subparsers.add_parser("worker", help="Воркер распределенного обхода через общую очередь в MongoDB")
+    worker_parser.add_argument("--once", action="store_true", help="Завершиться, когда очередь опустеет")
+
+    subparsers.add_parser("schedule", help="Долгоживущий режим с адаптивным планированием обходов категорий")
+
+    subparsers.add_parser("reparse", help="Повторный разбор архива ответов без обращения к сайту")
+
+    export_parser = subparsers.add_parser("export", help="Потоковая выгрузка товаров в JSONL или CSV")
+    export_parser.add_argument("--format", dest="output_format", choices=["jsonl", "csv"], default="jsonl")
+    export_parser.add_argument("--output", default="-", help="Путь к файлу, '-' — стандартный вывод")
+    export_parser.add_argument("--fields", help="Поля через запятую")
+    export_parser.add_argument("--incremental", action="store_true", help="Только обновленные после прошлой выгрузки")
+    export_parser.add_argument("--name", default="default", help="Имя выгрузки для хранения водяного знака")
+
+    subparsers.add_parser("backfill", help="Заполнить новые поля в документах старого формата")
+
+    subparsers.add_parser(
+        "normalize-suppliers",
+        help="Перевести товары старого формата на ссылки в коллекцию поставщиков"
+    )
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args.command = "crawl"
+
+    return args
+
+
+async def main(args):
     """Главная функция для запуска парсинга"""
 
-    setup_logging()
+    if args.command == "worker":
+        from src.services.worker_service import WorkerService
+        await WorkerService().run('https://moscow.petrovich.ru/catalog/', once=args.once)
+        return
+
+    if args.command == "schedule":
+        from src.services.scheduler_service import SchedulerService
+        await SchedulerService().run('https://moscow.petrovich.ru/catalog/')
+        return
+
+    if args.command == "reparse":
+        from src.services.reparse_service import ReparseService
+        await ReparseService().reparse()
+        return
+
+    if args.command == "export":
+        from src.services.export_service import ExportService
+        await ExportService().export(
+            output=args.output,
+            output_format=args.output_format,
+            fields=args.fields.split(',') if args.fields else None,
+            incremental=args.incremental,
+            name=args.name
+        )
+        return
+
+    if args.command == "backfill":
+        from src.repository.mongo_client import mongo_client
+        from src.repository.repository import ProductRepository
+
+        await mongo_client.connect()
+        try:
+            await ProductRepository().backfill()
+        finally:
+            await mongo_client.disconnect()
+        return
+
+    if args.command == "normalize-suppliers":
+        from src.repository.mongo_client import mongo_client
+        from src.repository.repository import ProductRepository
+
+        await mongo_client.connect()
+        try:
+            await ProductRepository().normalize_legacy_suppliers()
+        finally:
+            await mongo_client.disconnect()
+        return
+
+    from src.services.parser_service import ParserService
 
     parser_service = ParserService()
 
     await parser_service.start_parsing('https://moscow.petrovich.ru/catalog/')
 
 
+def run(coroutine):
+    """Запускает цикл событий: uvloop при USE_UVLOOP=true, если пакет установлен"""
+
+    from src.core.settings import get_settings
+
+    if get_settings().use_uvloop:
+        try:
+            import uvloop
+        except ImportError:
+            logging.warning("uvloop не установлен, используется стандартный цикл asyncio")
+        else:
+            return uvloop.run(coroutine)
+
+    return asyncio.run(coroutine)
+
+
 if __name__ == "__main__":
 
+    setup_logging()
+
     try:
-        asyncio.run(main())
+        run(main(parse_args(sys.argv[1:])))
     except KeyboardInterrupt:
         print("Парсинг прерван пользователем")
         logging.warning("Парсинг прерван пользователем")
     except Exception as e:
         print(f"Критическая ошибка: {e}")
-        logging.error(f"Критическая ошибка в main: {e}")
\ No newline at end of file
+        logging.error(f"Критическая ошибка в main: {e}")
+        sys.exit(1)
\ No newline at end of file
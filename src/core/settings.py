@@ -1,3 +1,6 @@
+from functools import lru_cache
+from typing import Dict
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -8,6 +11,90 @@ class Settings(BaseSettings):
     mongo_url: str = Field(default="mongodb://127.0.0.1:27017/")
     db_name: str = Field(default="Petrovich")
     collection_name: str = Field(default="products")
+    suppliers_collection: str = Field(default="suppliers")
+    attributes_collection: str = Field(default="attribute_names")
+    meta_collection: str = Field(default="meta")
+
+    # Архив сырых ответов (API JSON и HTML листингов)
+    archive_enabled: bool = Field(default=False)
+    archive_dir: str = Field(default="archive")
+    archive_segment_max_mb: int = Field(default=256)
+
+    # Повторный разбор архива без обращения к сети
+    reparse_workers: int = Field(default=0)
+    reparse_chunk_size: int = Field(default=200)
+
+    # HTTP-кэш с условной перепроверкой (ETag / Last-Modified)
+    http_cache_enabled: bool = Field(default=False)
+    http_cache_path: str = Field(default="cache/http_cache.sqlite")
+    http_cache_max_mb: int = Field(default=1024)
+    http_cache_default_ttl: int = Field(default=3600)
+    # TTL в секундах по регулярным выражениям URL, проверяются по порядку
+    http_cache_ttls: Dict[str, int] = Field(default={
+        r"/catalog/$": 86400,
+        r"api\.petrovich\.ru/catalog/v5/products/": 900,
+    })
+    # Пропускать разбор товаров с неизменившимся ответом API; false — пересохранить все
+    # (например, чтобы перевести старые документы на новый формат)
+    skip_unchanged_products: bool = Field(default=True)
+
+    # Обновлять цены и наличие известных товаров по карточкам листинга без запроса к API
+    listing_card_updates: bool = Field(default=True)
+
+    # Приемники результатов: mongo, jsonl, parquet (через запятую)
+    output_sinks: str = Field(default="mongo")
+    output_dir: str = Field(default="output")
+    sink_batch_size: int = Field(default=500)
+    jsonl_compression: str = Field(default="")
+    parquet_row_group_size: int = Field(default=10000)
+    # Часть Parquet закрывается (становится читаемой) после стольких групп строк или при commit
+    parquet_part_row_groups: int = Field(default=10)
+
+    # Потоковая выгрузка товаров
+    export_batch_size: int = Field(default=5000)
+    export_state_collection: str = Field(default="export_state")
+    # Документы, обновленные позже now - lag, откладываются до следующей выгрузки
+    export_safety_lag_seconds: int = Field(default=60)
+
+    # Распределенная очередь задач для нескольких контейнеров-воркеров
+    queue_collection: str = Field(default="crawl_queue")
+    queue_lease_seconds: int = Field(default=120)
+    queue_max_attempts: int = Field(default=5)
+    queue_poll_seconds: float = Field(default=5.0)
+    # Через сколько секунд после завершения цикла обход начинается заново
+    queue_recrawl_interval: int = Field(default=21600)
+
+    # Адаптивный планировщик повторных обходов категорий
+    category_stats_collection: str = Field(default="category_stats")
+    scheduler_requests_per_hour: int = Field(default=3000)
+    scheduler_min_interval_hours: float = Field(default=1.0)
+    scheduler_max_interval_hours: float = Field(default=168.0)
+    # Начальная оценка доли товаров категории, меняющихся за час
+    scheduler_initial_change_rate: float = Field(default=0.05)
+    # Вес нового наблюдения в экспоненциальном сглаживании частоты изменений
+    scheduler_smoothing: float = Field(default=0.3)
+    scheduler_category_refresh_hours: float = Field(default=24.0)
+
+    # Сервис запросов чтения
+    query_cache_size: int = Field(default=1024)
+    query_cache_ttl_seconds: float = Field(default=60.0)
+    # Как часто перечитывать версию каталога из MongoDB (записи других процессов)
+    query_version_check_seconds: float = Field(default=1.0)
+    query_page_size: int = Field(default=50)
+
+    # Режим обхода с ограниченной памятью
+    memory_bounded: bool = Field(default=False)
+    # Бюджет памяти на одновременно загружаемые тела ответов и оценка размера одного тела
+    memory_budget_mb: int = Field(default=64)
+    memory_body_estimate_kb: int = Field(default=1024)
+    # Сколько товаров обрабатывается параллельно в этом режиме
+    crawl_concurrency: int = Field(default=4)
+    # Очередь товаров: сколько элементов держать в памяти, остальные — во временной базе на диске
+    frontier_memory_items: int = Field(default=1000)
+    frontier_spill_dir: str = Field(default="cache/frontier")
+
+    # Цикл событий uvloop вместо стандартного (нужен установленный пакет uvloop)
+    use_uvloop: bool = Field(default=False)
 
     class Config:
         env_file = ".env"
@@ -15,4 +102,27 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Настройки создаются при первом обращении, а не при импорте модуля"""
+
+    return Settings()
+
+
+class _LazySettings:
+    """Ссылка на общие настройки: Settings() создается при первом обращении к атрибуту
+
+    Поэтому from src.core.settings import settings не читает окружение и .env при импорте.
+    """
+
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name: str, value):
+        setattr(get_settings(), name, value)
+
+    def __repr__(self) -> str:
+        return repr(get_settings())
+
+
+settings = _LazySettings()
\ No newline at end of file
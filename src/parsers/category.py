@@ -1,10 +1,11 @@
 import re
 import logging
-from typing import List
+from typing import Iterator, List, Optional
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 
+from src.schemas.product import ListingCard
 from src.scrapers.scraper import PageScraper
 
 logger = logging.getLogger(__name__)
@@ -13,6 +14,12 @@ logger = logging.getLogger(__name__)
 class CategoryPageParser:
     """Парсер ссылок на товары"""
 
+    # Элементы карточки товара в листинге
+    card_title_selector = '[data-test="product-title"]'
+    card_retail_price_selector = '[data-test="product-retail-price"]'
+    card_gold_price_selector = '[data-test="product-gold-price"]'
+    card_stock_selector = '[data-test="product-card-remains"]'
+
     def __init__(self):
         self.scraper = PageScraper()
 
@@ -28,16 +35,24 @@ class CategoryPageParser:
 
         soup = BeautifulSoup(html, 'html.parser')
 
-        # Получаем товары с первой страницы для сравнения
-        first_page_products = self._extract_product_urls_from_soup(soup)
-        if not first_page_products:
-            logger.info("На первой странице товары не найдены")
-            return 1
+        # Для сравнения достаточно множества ссылок первой страницы
+        first_page_products = frozenset(self._extract_product_urls_from_soup(soup))
+
+        # Проверяем наличие кнопки "..."
+        has_dots_button = soup.select_one('a[data-test="paginator-next-chunk-btn"]') is not None
 
         # Ищем видимые номера страниц в пагинации
         pattern = r'p=(\d+)'
         matches = re.findall(pattern, html)
 
+        # Дерево и тело первой страницы больше не нужны — не держим их во время перебора
+        soup.decompose()
+        del soup, html
+
+        if not first_page_products:
+            logger.info("На первой странице товары не найдены")
+            return 1
+
         if matches:
             visible_max = max(int(match) for match in matches)
             logger.debug(f"Максимальная видимая страница: p={visible_max}")
@@ -45,10 +60,7 @@ class CategoryPageParser:
             logger.info("Пагинация не найдена, возвращаем 1 страницу")
             return 1
 
-        # Проверяем наличие кнопки "..."
-        dots_button = soup.select_one('a[data-test="paginator-next-chunk-btn"]')
-
-        if not dots_button:
+        if not has_dots_button:
             # Если нет кнопки "..." - берем максимальную видимую страницу
             total_pages = visible_max + 1
             logger.info(f"Кнопка '...' не найдена. Всего страниц: {total_pages}")
@@ -70,10 +82,12 @@ class CategoryPageParser:
             if test_html:
                 test_soup = BeautifulSoup(test_html, 'html.parser')
                 current_page_products = self._extract_product_urls_from_soup(test_soup)
+                test_soup.decompose()
+                del test_soup, test_html
 
                 if current_page_products:
                     # Сравниваем с первой страницей
-                    if set(current_page_products) == set(first_page_products):
+                    if set(current_page_products) == first_page_products:
                         # Содержимое совпадает с первой страницей - конец страниц
                         logger.debug(f"Страница p={current_page} содержит те же товары, что и p=0 - достигнут конец")
                         break
@@ -118,18 +132,22 @@ class CategoryPageParser:
     async def create_page_links(self, url: str) -> List[str]:
         """Создает ссылки на все страницы категории"""
 
-        pages = []
         page_count = await self.get_page_count(url)
 
         logger.info(f"Создание ссылок для {page_count} страниц")
 
-        # Страницы нумеруются с 0: ?p=0, ?p=1, ?p=2
-        for page_number in range(0, page_count):
-            pages.append(f'{url}?p={page_number}')
+        pages = list(self.iter_page_links(url, page_count))
 
         logger.debug(f"Создано ссылок на страницы: {len(pages)}")
         return pages
 
+    def iter_page_links(self, url: str, page_count: int) -> Iterator[str]:
+        """Лениво выдает ссылки на страницы категории"""
+
+        # Страницы нумеруются с 0: ?p=0, ?p=1, ?p=2
+        for page_number in range(0, page_count):
+            yield f'{url}?p={page_number}'
+
     async def get_product_links(self, url: str) -> List[str]:
         """Извлекает ссылки на товары со страницы категории"""
 
@@ -141,6 +159,74 @@ class CategoryPageParser:
 
         soup = BeautifulSoup(html, 'html.parser')
         products_list = self._extract_product_urls_from_soup(soup)
+        soup.decompose()
 
         logger.info(f"Найдено товаров: {len(products_list)}")
-        return products_list
\ No newline at end of file
+        return products_list
+
+    async def get_product_cards(self, url: str) -> List[ListingCard]:
+        """Извлекает карточки товаров (ID, название, цены, наличие) со страницы категории"""
+
+        logger.debug(f"Извлечение карточек с: {url}")
+
+        html = await self.scraper.scrape_page(url)
+        if not html:
+            return []
+
+        soup = BeautifulSoup(html, 'html.parser')
+        cards = self._extract_cards_from_soup(soup)
+        soup.decompose()
+
+        logger.info(f"Найдено карточек: {len(cards)}")
+        return cards
+
+    def _extract_cards_from_soup(self, soup: BeautifulSoup) -> List[ListingCard]:
+        """Разбирает карточки товаров за один проход по блокам листинга"""
+
+        cards = {}
+        petrovich_url = 'https://moscow.petrovich.ru'
+
+        item_blocks = soup.find_all('div', class_='pt-flex pt-flex-col pt-justify-between')
+
+        for block in item_blocks:
+            link = block.find('a', href=re.compile(r'^/product/\d+'))
+            if not link:
+                continue
+
+            full_url = urljoin(petrovich_url, link.get('href'))
+            product_id = re.search(r'/product/(\d+)', full_url).group(1)
+            if product_id in cards:
+                continue
+
+            title_tag = block.select_one(self.card_title_selector)
+            title = (title_tag or link).get_text(' ', strip=True)
+
+            cards[product_id] = ListingCard(
+                product_id=product_id,
+                url=full_url,
+                title=title,
+                price=self._parse_card_price(block.select_one(self.card_retail_price_selector)),
+                gold_price=self._parse_card_price(block.select_one(self.card_gold_price_selector)),
+                stock=self._parse_card_text(block.select_one(self.card_stock_selector))
+            )
+
+        return [cards[product_id] for product_id in sorted(cards)]
+
+    def _parse_card_price(self, tag: Optional[Tag]) -> Optional[float]:
+        """Разбирает цену вида «1 234,50 ₽»"""
+
+        if tag is None:
+            return None
+
+        digits = re.sub(r'[^\d,.]', '', tag.get_text()).replace(',', '.').strip('.')
+        try:
+            return float(digits) if digits else None
+        except ValueError:
+            return None
+
+    def _parse_card_text(self, tag: Optional[Tag]) -> Optional[str]:
+        if tag is None:
+            return None
+
+        text = ' '.join(tag.get_text(' ', strip=True).split())
+        return text or None
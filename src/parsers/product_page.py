@@ -1,7 +1,7 @@
 import re
 import json
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Union
 
 from src.scrapers.scraper import PageScraper
 from src.schemas.product import Product, Supplier, SupplierOffer, PriceInfo, Attribute
@@ -20,23 +20,42 @@ class ProductPropertyParser:
     async def parse_product(self, url: str) -> Optional[Product]:
         """Парсит страницу товара через API, возвращая объект Product"""
 
+        _, product = await self.parse_product_if_changed(url, skip_unchanged=False)
+        return product
+
+    async def parse_product_if_changed(self, url: str, skip_unchanged: bool = True) -> Tuple[bool, Optional[Product]]:
+        """Парсит товар, пропуская разбор, если ответ API не менялся (304 или свежий кэш)
+
+        Возвращает пару (изменился ли ответ, товар)
+        """
+
         logger.info(f"Парсинг товара: {url}")
 
         # Извлекаем ID товара из URL
         product_id = self._extract_product_id(url)
         if not product_id:
             logger.error(f"Не удалось извлечь ID товара из URL: {url}")
-            return None
+            return True, None
 
         # Формируем API URL
-        api_url = f"{self.api_base_url}/{product_id}{self.api_params}"
+        api_url = self._api_url(product_id)
         logger.debug(f"API URL: {api_url}")
 
         # Получаем данные из API
-        json_data = await self._fetch_api_data(api_url)
+        json_data, not_modified = await self._fetch_api_data(api_url, skip_unchanged)
+
+        if not_modified and skip_unchanged:
+            logger.info(f"Товар не изменился, разбор пропущен: {url}")
+            return False, None
+
         if not json_data:
             logger.error(f"Не удалось получить данные из API: {api_url}")
-            return None
+            return True, None
+
+        return True, self.parse_product_data(json_data, url)
+
+    def parse_product_data(self, json_data: Dict[str, Any], url: str) -> Optional[Product]:
+        """Собирает объект Product из ответа API без обращения к сети"""
 
         # Проверяем успешность ответа
         if json_data.get('state', {}).get('code') != 20001:
@@ -73,9 +92,28 @@ class ProductPropertyParser:
             )
 
         except Exception as e:
-            logger.error(f"Ошибка при парсинге JSON данных товара {product_id}: {e}")
+            logger.error(f"Ошибка при парсинге JSON данных товара {url}: {e}")
             return None
 
+    def confirm_product(self, url: str):
+        """Отмечает товар сохраненным: при неизменном ответе API его можно не разбирать"""
+
+        product_id = self._extract_product_id(url)
+        if product_id:
+            self.scraper.confirm(self._api_url(product_id))
+
+    def _api_url(self, product_id: str) -> str:
+        return f"{self.api_base_url}/{product_id}{self.api_params}"
+
+    def product_url_from_api_url(self, api_url: str) -> Optional[str]:
+        """Восстанавливает URL страницы товара по URL запроса к API"""
+
+        match = re.search(r'/products/(\d+)', api_url)
+        if match:
+            return f"https://moscow.petrovich.ru/product/{match.group(1)}/"
+
+        return None
+
     def _extract_product_id(self, url: str) -> Optional[str]:
         """Извлекает ID товара из URL"""
 
@@ -88,24 +126,29 @@ class ProductPropertyParser:
         logger.warning(f"Не удалось извлечь ID товара из URL: {url}")
         return None
 
-    async def _fetch_api_data(self, api_url: str) -> Optional[Dict[str, Any]]:
-        """Получает JSON данные из API"""
+    async def _fetch_api_data(self, api_url: str, skip_unchanged: bool = False) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Получает JSON данные из API и признак неизменности ответа"""
 
         try:
-            response_text = await self.scraper.scrape_page(api_url)
-            if not response_text:
-                return None
+            # Ответ станет «неизменившимся» только после сохранения товара (confirm_product)
+            result = await self.scraper.fetch(api_url, confirm_later=True)
+            if not result or not result.text:
+                return None, False
+
+            # Неизменившийся ответ не нужно даже декодировать
+            if result.not_modified and skip_unchanged:
+                return None, True
 
-            json_data = json.loads(response_text)
-            return json_data
+            json_data = json.loads(result.text)
+            return json_data, result.not_modified
 
         except json.JSONDecodeError as e:
             logger.error(f"Ошибка парсинга JSON: {e}")
-            return None
+            return None, False
 
         except Exception as e:
             logger.error(f"Ошибка получения данных из API: {e}")
-            return None
+            return None, False
 
     def _extract_title(self, product_data: Dict[str, Any]) -> str:
         """Извлекает название товара"""
@@ -295,7 +338,7 @@ class ProductPropertyParser:
         return 'Нет данных'
 
     def _extract_attributes(self, product_data: Dict[str, Any]) -> List[Attribute]:
-        """Извлекает атрибуты товара"""
+        """Извлекает атрибуты товара с типизированными значениями"""
 
         attributes = []
         seen_attributes = set()
@@ -325,31 +368,60 @@ class ProductPropertyParser:
                 if not prop.get('is_description', True):
                     continue
 
-                if title and values:
-                    value_parts = []
+                if slug and title and values:
+                    typed_values = []
+                    value_unit = unit or None
                     for val in values:
                         val_title = val.get('title', '')
                         if val_title:
-                            value_parts.append(val_title)
+                            typed_value, parsed_unit = self._parse_attribute_value(val_title)
+
+                            if unit and parsed_unit and not self._same_unit(unit, parsed_unit):
+                                # «12.5 см» при единице «мм»: число в другой единице сохранять нельзя
+                                logger.warning(
+                                    f"Единица значения '{val_title}' не совпадает с единицей "
+                                    f"характеристики {slug} ({unit}), значение сохранено строкой"
+                                )
+                                typed_value = val_title.strip()
 
-                    if value_parts:
-                        value_str = ', '.join(value_parts)
-                        if unit:
-                            attr_name_with_unit = f"{title}, {unit}"
-                        else:
-                            attr_name_with_unit = title
+                            typed_values.append(typed_value)
+                            value_unit = value_unit or parsed_unit
 
+                    if typed_values:
                         # Проверяем на дубликаты
-                        title_lower = title.lower().strip()
-                        if title_lower not in seen_attributes:
+                        if slug not in seen_attributes:
                             attributes.append(Attribute(
-                                attr_name=attr_name_with_unit,
-                                attr_value=value_str
+                                slug=slug,
+                                name=title.strip(),
+                                unit=value_unit,
+                                value=typed_values[0] if len(typed_values) == 1 else typed_values
                             ))
-                            seen_attributes.add(title_lower)
+                            seen_attributes.add(slug)
 
         return attributes
 
+    def _parse_attribute_value(self, text: str) -> Tuple[Union[float, str], Optional[str]]:
+        """Разбирает значение характеристики: число с необязательной единицей или строка"""
+
+        # Единица — только буквы (с ²/³ или через «/», например «кг/м³») либо «%»;
+        # значения вроде «3-х слойный» остаются строками
+        match = re.match(
+            r'^\s*(-?\d+(?:[.,]\d+)?)\s*'
+            r'([A-Za-zА-Яа-яЁё]{1,10}[²³]?(?:/[A-Za-zА-Яа-яЁё]{1,10}[²³]?)?\.?|%)?\s*$',
+            text
+        )
+        if match:
+            number = float(match.group(1).replace(',', '.'))
+            return number, match.group(2)
+
+        return text.strip(), None
+
+    def _same_unit(self, first: str, second: str) -> bool:
+        def normalize(unit: str) -> str:
+            return unit.strip().rstrip('.').lower()
+
+        return normalize(first) == normalize(second)
+
     def _extract_supplier_info(self, product_data: Dict[str, Any], page_url: str) -> List[Supplier]:
         """Извлекает информацию о поставщике и предложениях"""
 
@@ -388,6 +460,7 @@ class ProductPropertyParser:
             supplier_offers.append(gold_offer)
 
         supplier = Supplier(
+            dealer_id='petrovich',
             supplier_name='Петрович',
             supplier_tel='8 (499) 334-88-88; 8 (499) 334-88-95',
             supplier_address='г. Москва, ул. Бутырский Вал, д. 68/70 (строение 1), БЦ «Бейкер Плаза», офис 66 (6 этаж)',
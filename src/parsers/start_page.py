@@ -22,6 +22,10 @@ class StartPageParser:
         logger.info(f"Получение категорий с: {url}")
 
         html = await self.scraper.scrape_page(url)
+        if not html:
+            logger.error(f"Не удалось загрузить страницу каталога: {url}")
+            return []
+
         soup = BeautifulSoup(html, "html.parser")
 
         categories = []
@@ -43,6 +47,8 @@ class StartPageParser:
                         categories.append(full_url)
                         logger.debug(f"Найдена категория: {full_url}")
 
+        soup.decompose()
+
         logger.info(f"Всего найдено категорий: {len(categories)}")
 
         return categories
\ No newline at end of file
@@ -0,0 +1,202 @@
+import json
+import time
+import base64
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from bson import ObjectId
+
+from src.core.settings import settings
+from src.query.cache import TTLCache
+from src.repository.catalog_version import catalog_version
+from src.repository.mongo_client import mongo_client
+from src.repository.repository import ProductRepository
+from src.schemas.query import ProductPage
+
+logger = logging.getLogger(__name__)
+
+# Поля товара в списках и результатах поиска
+SUMMARY_PROJECTION = {
+    'article': 1, 'title': 1, 'brand': 1, 'category': 1, 'min_price': 1, 'updated_at': 1,
+}
+
+
+def encode_cursor(value: Any, document_id: ObjectId) -> str:
+    """Курсор — последний ключ сортировки и _id страницы"""
+
+    raw = json.dumps([value, str(document_id)]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, ObjectId]:
+    try:
+        value, document_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return value, ObjectId(document_id)
+    except Exception:
+        raise ValueError(f"Некорректный курсор: {cursor}")
+
+
+class CatalogQueryService:
+    """Запросы чтения к собранному каталогу: по артикулу, фильтры, полнотекстовый поиск
+
+    Пагинация — по ключам (keyset) вместо skip/limit, поэтому стоимость
+    страницы не растет с ее номером. Горячие запросы кэшируются в процессе;
+    ключ кэша включает версию каталога, которую краулер увеличивает после
+    каждой пачки записей.
+    """
+
+    def __init__(self, cache: Optional[TTLCache] = None):
+        self.repository = ProductRepository()
+        self.cache = cache or TTLCache(settings.query_cache_size, settings.query_cache_ttl_seconds)
+        self.page_size = settings.query_page_size
+
+        self._version = 0
+        self._version_checked_at = 0.0
+        self._dictionaries_version = None
+
+    async def connect(self):
+        await mongo_client.connect()
+        await self.repository.ensure_indexes()
+
+    async def close(self):
+        await mongo_client.disconnect()
+
+    async def get_by_article(self, article: str) -> Optional[Dict[str, Any]]:
+        """Товар по артикулу в полной форме"""
+
+        async def load():
+            document = await self.repository.collection.find_one(
+                {'article': article},
+                projection={'_id': 0, 'card_signature': 0, 'card_state': 0}
+            )
+            if document is None:
+                return None
+
+            await self._ensure_dictionaries()
+            return self.repository.expand_document(document)
+
+        return await self._cached(('article', article), load)
+
+    async def list_products(
+            self,
+            category: Optional[str] = None,
+            brand: Optional[str] = None,
+            min_price: Optional[float] = None,
+            max_price: Optional[float] = None,
+            cursor: Optional[str] = None,
+            limit: Optional[int] = None
+    ) -> ProductPage:
+        """Товары с фильтром по категории, бренду и цене, по возрастанию цены"""
+
+        limit = limit or self.page_size
+
+        async def load():
+            query: Dict[str, Any] = {}
+            if category:
+                query['category'] = category
+            if brand:
+                query['brand'] = brand
+
+            # Нижняя граница всегда задана: товары без цены не участвуют, диапазон идет по индексу
+            price_range: Dict[str, float] = {'$gte': min_price or 0}
+            if max_price is not None:
+                price_range['$lte'] = max_price
+
+            conditions: List[Dict[str, Any]] = [{'min_price': price_range}]
+            if cursor:
+                last_price, last_id = decode_cursor(cursor)
+                conditions.append({'$or': [
+                    {'min_price': {'$gt': last_price}},
+                    {'min_price': last_price, '_id': {'$gt': last_id}},
+                ]})
+            query['$and'] = conditions
+
+            documents = await self.repository.collection.find(
+                query,
+                projection=SUMMARY_PROJECTION,
+                sort=[('min_price', 1), ('_id', 1)],
+                limit=limit
+            ).to_list(length=limit)
+
+            return self._page(documents, 'min_price', limit)
+
+        key = ('list', category, brand, min_price, max_price, cursor, limit)
+        return await self._cached(key, load)
+
+    async def search(
+            self,
+            text: str,
+            category: Optional[str] = None,
+            cursor: Optional[str] = None,
+            limit: Optional[int] = None
+    ) -> ProductPage:
+        """Полнотекстовый поиск по названию и описанию, по убыванию релевантности"""
+
+        limit = limit or self.page_size
+
+        async def load():
+            match: Dict[str, Any] = {'$text': {'$search': text}}
+            if category:
+                match['category'] = category
+
+            pipeline: List[Dict[str, Any]] = [
+                {'$match': match},
+                {'$addFields': {'score': {'$meta': 'textScore'}}},
+            ]
+            if cursor:
+                last_score, last_id = decode_cursor(cursor)
+                pipeline.append({'$match': {'$or': [
+                    {'score': {'$lt': last_score}},
+                    {'score': last_score, '_id': {'$gt': last_id}},
+                ]}})
+            pipeline += [
+                {'$sort': {'score': -1, '_id': 1}},
+                {'$limit': limit},
+                {'$project': {**SUMMARY_PROJECTION, 'score': 1}},
+            ]
+
+            cursor_result = await self.repository.collection.aggregate(pipeline)
+            documents = await cursor_result.to_list(length=limit)
+
+            return self._page(documents, 'score', limit)
+
+        key = ('search', text, category, cursor, limit)
+        return await self._cached(key, load)
+
+    def _page(self, documents: List[Dict[str, Any]], sort_field: str, limit: int) -> ProductPage:
+        next_cursor = None
+        if len(documents) == limit:
+            last = documents[-1]
+            next_cursor = encode_cursor(last[sort_field], last['_id'])
+
+        for document in documents:
+            document.pop('_id', None)
+
+        return ProductPage(items=documents, next_cursor=next_cursor)
+
+    async def _current_version(self) -> Tuple[int, int]:
+        """Версия каталога; общая версия перечитывается не чаще раза в query_version_check_seconds"""
+
+        now = time.monotonic()
+        if now - self._version_checked_at >= settings.query_version_check_seconds:
+            self._version = await catalog_version.current()
+            self._version_checked_at = now
+
+        return self._version, catalog_version.local
+
+    async def _cached(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        cache_key = (await self._current_version(), key)
+
+        result = self.cache.get(cache_key)
+        if result is None:
+            result = await load()
+            if result is not None:
+                self.cache.set(cache_key, result)
+
+        return result
+
+    async def _ensure_dictionaries(self):
+        version = await self._current_version()
+        if self._dictionaries_version != version:
+            await self.repository.load_dictionaries()
+            self._dictionaries_version = version
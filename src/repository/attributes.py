@@ -0,0 +1,95 @@
+import logging
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+
+from src.core.settings import settings
+from src.repository.mongo_client import mongo_client
+from src.schemas.product import Product
+
+logger = logging.getLogger(__name__)
+
+
+def pack_attributes(attributes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Переводит атрибуты в шаблон «ключ-значение»: {k: slug, v: значение, u: единица}
+
+    Названия хранятся один раз в справочнике атрибутов по slug.
+    """
+
+    packed = []
+
+    for attribute in attributes:
+        entry = {'k': attribute['slug'], 'v': attribute['value']}
+        if attribute.get('unit'):
+            entry['u'] = attribute['unit']
+        packed.append(entry)
+
+    return packed
+
+
+def unpack_attributes(packed: List[Dict[str, Any]], names: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Восстанавливает атрибуты с названиями по справочнику"""
+
+    unpacked = []
+
+    for entry in packed:
+        # Документы в старом формате (attr_name / attr_value): slug неизвестен, значение — строка
+        if 'k' not in entry:
+            unpacked.append({
+                'slug': entry.get('attr_name', ''),
+                'name': entry.get('attr_name', ''),
+                'unit': None,
+                'value': entry.get('attr_value', ''),
+            })
+            continue
+
+        unpacked.append({
+            'slug': entry['k'],
+            'name': names.get(entry['k'], entry['k']),
+            'unit': entry.get('u'),
+            'value': entry['v'],
+        })
+
+    return unpacked
+
+
+class AttributeRepository:
+    """Справочник названий атрибутов по slug"""
+
+    def __init__(self):
+        self._collection = None
+        self._known: Dict[str, str] = {}
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = mongo_client.get_collection(settings.attributes_collection)
+        return self._collection
+
+    async def save_from_products(self, products: List[Product]):
+        """Дописывает в справочник новые или переименованные атрибуты"""
+
+        changed: Dict[str, str] = {}
+
+        for product in products:
+            for attribute in product.attributes:
+                if self._known.get(attribute.slug) != attribute.name:
+                    changed[attribute.slug] = attribute.name
+
+        if not changed:
+            return
+
+        await self.collection.bulk_write([
+            UpdateOne({"_id": slug}, {"$set": {"name": name}}, upsert=True)
+            for slug, name in changed.items()
+        ], ordered=False)
+
+        self._known.update(changed)
+        logger.debug(f"Справочник атрибутов: обновлено {len(changed)}")
+
+    async def load_all(self) -> Dict[str, str]:
+        names = {}
+        async for document in self.collection.find({}):
+            names[document['_id']] = document.get('name', document['_id'])
+
+        return names
@@ -0,0 +1,39 @@
+import logging
+
+from src.core.settings import settings
+from src.repository.mongo_client import mongo_client
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogVersion:
+    """Счетчик версии каталога: увеличивается после каждой пачки записей краулера
+
+    Читатели включают версию в ключи кэша, поэтому новая версия делает
+    закэшированные результаты недостижимыми. Локальный счетчик сразу видит
+    записи своего процесса, счетчик в MongoDB — записи других контейнеров.
+    """
+
+    def __init__(self):
+        self.local = 0
+        self._collection = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = mongo_client.get_collection(settings.meta_collection)
+        return self._collection
+
+    async def bump(self):
+        self.local += 1
+        try:
+            await self.collection.update_one({"_id": "catalog_version"}, {"$inc": {"value": 1}}, upsert=True)
+        except Exception as e:
+            logger.error(f"Ошибка обновления версии каталога: {e}")
+
+    async def current(self) -> int:
+        document = await self.collection.find_one({"_id": "catalog_version"})
+        return document.get("value", 0) if document else 0
+
+
+catalog_version = CatalogVersion()
@@ -0,0 +1,42 @@
+import logging
+from typing import Any, Dict
+
+from src.core.settings import settings
+from src.repository.mongo_client import mongo_client
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryStatsRepository:
+    """Статистика обхода категорий для планировщика: частота изменений, стоимость, снимок цен"""
+
+    def __init__(self):
+        self._collection = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = mongo_client.get_collection(settings.category_stats_collection)
+        return self._collection
+
+    async def load_all(self) -> Dict[str, Dict[str, Any]]:
+        """Загружает статистику всех категорий без снимков товаров"""
+
+        stats = {}
+        async for document in self.collection.find({}, projection={"snapshot": 0}):
+            stats[document.pop("_id")] = document
+
+        return stats
+
+    async def get_snapshot(self, category_url: str) -> Dict[str, str]:
+        """Возвращает снимок подписей товаров категории с прошлого обхода"""
+
+        document = await self.collection.find_one({"_id": category_url}, projection={"snapshot": 1})
+        return document.get("snapshot", {}) if document else {}
+
+    async def save(self, category_url: str, stats: Dict[str, Any], snapshot: Dict[str, str]):
+        await self.collection.update_one(
+            {"_id": category_url},
+            {"$set": {**stats, "snapshot": snapshot}},
+            upsert=True
+        )
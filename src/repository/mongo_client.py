@@ -12,15 +12,22 @@ class MongoClient:
         self.database = None
 
     async def connect(self):
-        self.client = AsyncMongoClient(settings.mongo_url)
+        # Повторное подключение не нужно: клиент общий для приемника, очереди и репозиториев
+        if self.client is not None:
+            return
+
+        client = AsyncMongoClient(settings.mongo_url)
         # Проверяем подключение
-        await self.client.admin.command('ping')
+        await client.admin.command('ping')
+        self.client = client
         self.database = self.client[settings.db_name]
         logger.info(f"MongoDB подключен: {settings.db_name}")
 
     async def disconnect(self):
         if self.client:
             await self.client.close()
+            self.client = None
+            self.database = None
 
     def get_collection(self, name: str):
         return self.database[name]
@@ -1,7 +1,15 @@
 import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from pymongo import ASCENDING, TEXT, UpdateOne
+
 from src.core.settings import settings
+from src.repository.attributes import AttributeRepository, pack_attributes, unpack_attributes
+from src.repository.catalog_version import catalog_version
 from src.repository.mongo_client import mongo_client
-from src.schemas.product import Product
+from src.repository.suppliers import SUPPLIER_FIELDS, SupplierRepository, pack_suppliers, unpack_suppliers
+from src.schemas.product import ListingCard, Product
 
 logger = logging.getLogger(__name__)
 
@@ -9,6 +17,13 @@ logger = logging.getLogger(__name__)
 class ProductRepository:
     def __init__(self):
         self._collection = None
+        self.suppliers = SupplierRepository()
+        self.attributes = AttributeRepository()
+
+        # Справочники для сборки документов в полную форму
+        self._supplier_dictionary: Dict[str, Dict[str, Any]] = {}
+        self._attribute_names: Dict[str, str] = {}
+        self._dictionaries_loaded = False
 
     @property
     def collection(self):
@@ -16,22 +31,381 @@ class ProductRepository:
             self._collection = mongo_client.get_collection(settings.collection_name)
         return self._collection
 
+    async def ensure_indexes(self):
+        """Создает индексы для поиска по артикулу, выгрузки, атрибутам и запросов чтения"""
+
+        await self.collection.create_index([("article", ASCENDING)])
+        await self.collection.create_index([("updated_at", ASCENDING), ("_id", ASCENDING)])
+        # Шаблон атрибутов: диапазон по значению внутри категории — сканирование индекса
+        await self.collection.create_index([
+            ("category", ASCENDING),
+            ("attributes.k", ASCENDING),
+            ("attributes.v", ASCENDING),
+        ])
+        # Листинги с фильтром по цене и курсорной пагинацией по (min_price, _id)
+        await self.collection.create_index([("min_price", ASCENDING), ("_id", ASCENDING)])
+        await self.collection.create_index([
+            ("category", ASCENDING), ("min_price", ASCENDING), ("_id", ASCENDING)
+        ])
+        await self.collection.create_index([
+            ("category", ASCENDING), ("brand", ASCENDING), ("min_price", ASCENDING), ("_id", ASCENDING)
+        ])
+        await self.collection.create_index([
+            ("brand", ASCENDING), ("min_price", ASCENDING), ("_id", ASCENDING)
+        ])
+        await self.collection.create_index(
+            [("title", TEXT), ("description", TEXT)],
+            weights={"title": 10, "description": 1},
+            default_language="russian"
+        )
+
+    def _upsert_spec(self, product: Product) -> Dict[str, Any]:
+        """Формирует обновление: created_at только при вставке, updated_at по часам сервера"""
+
+        product_dict = product.model_dump(exclude={"created_at", "updated_at"})
+        product_dict["suppliers"] = pack_suppliers(product_dict["suppliers"])
+        product_dict["attributes"] = pack_attributes(product_dict["attributes"])
+        product_dict["min_price"] = self._min_price(product)
+
+        # Товар без карточки (reparse, ручной запуск) не должен стирать сохраненные подписи
+        for field in ("card_signature", "card_state"):
+            if product_dict[field] is None:
+                del product_dict[field]
+
+        return {
+            "$set": product_dict,
+            "$setOnInsert": {"created_at": product.created_at},
+            "$currentDate": {"updated_at": True},
+        }
+
+    def _min_price(self, product: Product) -> Optional[float]:
+        """Минимальная цена среди предложений — для фильтров и сортировки"""
+
+        prices = [
+            price.price
+            for supplier in product.suppliers
+            for offer in supplier.supplier_offers
+            for price in offer.price
+            if price.price > 0
+        ]
+        return min(prices) if prices else None
+
     async def save_product(self, product: Product):
         try:
-            product_dict = product.model_dump()
+            await self.suppliers.save_from_products([product])
+            await self.attributes.save_from_products([product])
 
-            # Проверяем по артикулу
-            existing = await self.collection.find_one({"article": product.article})
+            result = await self.collection.update_one(
+                {"article": product.article},
+                self._upsert_spec(product),
+                upsert=True
+            )
 
-            if existing:
-                await self.collection.update_one(
-                    {"article": product.article},
-                    {"$set": product_dict}
-                )
+            await catalog_version.bump()
+
+            if result.upserted_id is None:
                 logger.info(f"Обновлен: {product.article}")
             else:
-                await self.collection.insert_one(product_dict)
                 logger.info(f"Сохранен: {product.article}")
 
         except Exception as e:
-            logger.error(f"Ошибка сохранения: {e}")
\ No newline at end of file
+            logger.error(f"Ошибка сохранения: {e}")
+
+    async def save_products(self, products: List[Product]) -> bool:
+        """Пакетно сохраняет товары одной операцией bulk_write, возвращает False при ошибке"""
+
+        if not products:
+            return True
+
+        operations = [
+            UpdateOne({"article": product.article}, self._upsert_spec(product), upsert=True)
+            for product in products
+        ]
+
+        try:
+            await self.suppliers.save_from_products(products)
+            await self.attributes.save_from_products(products)
+
+            result = await self.collection.bulk_write(operations, ordered=False)
+            await catalog_version.bump()
+            logger.info(f"Пакет сохранен: добавлено {result.upserted_count}, обновлено {result.modified_count}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Ошибка пакетного сохранения: {e}")
+            return False
+
+    async def iter_products(
+            self,
+            since: Optional[datetime] = None,
+            until: Optional[datetime] = None,
+            projection: Optional[Dict[str, Any]] = None,
+            batch_size: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Потоково отдает товары в порядке updated_at, опционально только измененные после since
+
+        Без since (полная выгрузка) отдаются и документы без updated_at, записанные до его появления.
+        """
+
+        query: Dict[str, Any] = {}
+        if since or until:
+            query["updated_at"] = {}
+            if since:
+                query["updated_at"]["$gt"] = since
+            if until:
+                query["updated_at"]["$lte"] = until
+
+        if until and not since:
+            query = {"$or": [query, {"updated_at": {"$exists": False}}]}
+
+        cursor = self.collection.find(
+            query,
+            projection=projection,
+            sort=[("updated_at", ASCENDING), ("_id", ASCENDING)],
+            batch_size=batch_size or settings.export_batch_size
+        )
+
+        async for document in cursor:
+            yield document
+
+    async def get_card_states(self, articles: List[str]) -> Dict[str, Dict[str, str]]:
+        """Возвращает сохраненные подписи карточек листинга по артикулам"""
+
+        states = {}
+        cursor = self.collection.find(
+            {"article": {"$in": articles}, "card_signature": {"$ne": None}},
+            projection={"_id": 0, "article": 1, "card_signature": 1, "card_state": 1}
+        )
+
+        async for document in cursor:
+            states[document["article"]] = {
+                "card_signature": document.get("card_signature"),
+                "card_state": document.get("card_state"),
+            }
+
+        return states
+
+    async def update_from_cards(self, cards: List[ListingCard]):
+        """Обновляет цены и наличие товаров по карточкам листинга без запроса к API"""
+
+        if not cards:
+            return
+
+        operations = []
+        for card in cards:
+            offers = [{"price": [{"qnt": 1, "discount": 0, "price": card.price}]}]
+            if card.gold_price and card.gold_price != card.price:
+                offers.append({"price": [{"qnt": 1, "discount": 0, "price": card.gold_price}]})
+
+            update = {
+                "suppliers.0.supplier_offers": offers,
+                # Обязательное поле предложения: у товара, сохраненного без предложений
+                # (нулевая цена), на уровне поставщика его еще нет
+                "suppliers.0.purchase_url": card.url,
+                "min_price": min(price for price in (card.price, card.gold_price) if price),
+                "card_state": card.state,
+            }
+            if card.stock:
+                update["suppliers.0.stock"] = card.stock
+
+            # Остальные общие поля предложений (доставка, фасовка) хранятся на уровне поставщика
+            # и не меняются; если их нет, при чтении действуют значения по умолчанию
+            operations.append(UpdateOne(
+                {"article": card.product_id, "suppliers.0.dealer_id": "petrovich"},
+                {"$set": update, "$currentDate": {"updated_at": True}}
+            ))
+
+        try:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            await catalog_version.bump()
+            logger.info(f"Обновлено по карточкам листинга: {result.modified_count}")
+
+        except Exception as e:
+            logger.error(f"Ошибка обновления по карточкам: {e}")
+
+    async def find_by_attribute_range(
+            self,
+            category: str,
+            slug: str,
+            min_value: Optional[float] = None,
+            max_value: Optional[float] = None,
+            limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Ищет товары категории по диапазону числового атрибута через индекс (category, k, v)"""
+
+        value_range: Dict[str, float] = {}
+        if min_value is not None:
+            value_range["$gte"] = min_value
+        if max_value is not None:
+            value_range["$lte"] = max_value
+
+        # Без границ ищем просто по наличию атрибута
+        condition: Dict[str, Any] = {"k": slug}
+        if value_range:
+            condition["v"] = value_range
+
+        cursor = self.collection.find(
+            {"category": category, "attributes": {"$elemMatch": condition}},
+            projection={"_id": 0},
+            limit=limit
+        )
+
+        documents = await cursor.to_list(length=limit)
+        await self.ensure_dictionaries()
+        return [self.expand_document(document) for document in documents]
+
+    async def load_dictionaries(self):
+        """Загружает справочники поставщиков и атрибутов для expand_document"""
+
+        self._supplier_dictionary = await self.suppliers.load_all()
+        self._attribute_names = await self.attributes.load_all()
+        self._dictionaries_loaded = True
+
+    async def ensure_dictionaries(self):
+        """Загружает справочники, если они еще не загружены"""
+
+        if not self._dictionaries_loaded:
+            await self.load_dictionaries()
+
+    async def get_product(self, article: str) -> Optional[Product]:
+        """Возвращает товар по артикулу в полной форме"""
+
+        document = await self.collection.find_one({"article": article}, projection={"_id": 0})
+        if document is None:
+            return None
+
+        await self.load_dictionaries()
+        return Product(**self.expand_document(document))
+
+    def expand_document(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """Собирает документ товара в полную форму по загруженным справочникам"""
+
+        if "suppliers" in document:
+            document["suppliers"] = unpack_suppliers(document["suppliers"], self._supplier_dictionary)
+        if "attributes" in document:
+            document["attributes"] = unpack_attributes(document["attributes"], self._attribute_names)
+        return document
+
+    async def backfill(self, batch_size: int = 1000):
+        """Заполняет поля, которых нет в документах, сохраненных до их появления"""
+
+        # Время последнего обновления неизвестно — считаем документ обновленным сейчас,
+        # чтобы он попал и в ближайшую инкрементальную выгрузку
+        result = await self.collection.update_many(
+            {"updated_at": {"$exists": False}},
+            {"$currentDate": {"updated_at": True}}
+        )
+        logger.info(f"Заполнено updated_at: {result.modified_count}")
+
+        # Без min_price товар не попадает в листинги запросов чтения
+        operations = []
+        filled = 0
+
+        cursor = self.collection.find(
+            {"min_price": {"$exists": False}},
+            projection={"suppliers": 1},
+            batch_size=batch_size
+        )
+
+        async for document in cursor:
+            operations.append(UpdateOne(
+                {"_id": document["_id"]},
+                {"$set": {"min_price": self._document_min_price(document.get("suppliers", []))}}
+            ))
+
+            if len(operations) >= batch_size:
+                await self.collection.bulk_write(operations, ordered=False)
+                filled += len(operations)
+                operations = []
+
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+            filled += len(operations)
+
+        if filled:
+            await catalog_version.bump()
+        logger.info(f"Заполнено min_price: {filled}")
+
+    def _document_min_price(self, suppliers: List[Dict[str, Any]]) -> Optional[float]:
+        """То же, что _min_price, по поставщикам документа в любом формате"""
+
+        prices = [
+            price.get("price") or 0
+            for supplier in suppliers
+            for offer in supplier.get("supplier_offers", [])
+            for price in offer.get("price", [])
+        ]
+        prices = [price for price in prices if price > 0]
+        return min(prices) if prices else None
+
+    async def normalize_legacy_suppliers(self, batch_size: int = 1000):
+        """Переводит документы старого формата на ссылки в коллекцию поставщиков"""
+
+        operations = []
+        suppliers: Dict[str, Dict[str, Any]] = {}
+        converted = 0
+
+        cursor = self.collection.find(
+            {"suppliers.supplier_name": {"$exists": True}},
+            projection={"suppliers": 1},
+            batch_size=batch_size
+        )
+
+        async for document in cursor:
+            legacy = document.get("suppliers", [])
+
+            for supplier in legacy:
+                # В старых документах у Петровича не было dealer_id
+                if supplier.get("dealer_id") in (None, "Нет данных") and supplier.get("supplier_name") == "Петрович":
+                    supplier["dealer_id"] = "petrovich"
+
+                suppliers.setdefault(supplier["dealer_id"], {
+                    field: supplier[field] for field in SUPPLIER_FIELDS if field in supplier
+                })
+
+            operations.append(UpdateOne(
+                {"_id": document["_id"]},
+                {"$set": {"suppliers": pack_suppliers(legacy)}}
+            ))
+
+            if len(operations) >= batch_size:
+                await self.collection.bulk_write(operations, ordered=False)
+                converted += len(operations)
+                operations = []
+                logger.info(f"Нормализовано документов: {converted}")
+
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+            converted += len(operations)
+
+        if suppliers:
+            await self.suppliers.collection.bulk_write([
+                UpdateOne({"_id": dealer_id}, {"$setOnInsert": info}, upsert=True)
+                for dealer_id, info in suppliers.items()
+            ], ordered=False)
+
+        logger.info(f"Нормализация поставщиков завершена, документов: {converted}")
+
+
+class ExportStateRepository:
+    """Хранит водяные знаки инкрементальных выгрузок"""
+
+    def __init__(self):
+        self._collection = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = mongo_client.get_collection(settings.export_state_collection)
+        return self._collection
+
+    async def get_watermark(self, name: str) -> Optional[datetime]:
+        state = await self.collection.find_one({"_id": name})
+        return state.get("watermark") if state else None
+
+    async def set_watermark(self, name: str, watermark: datetime):
+        await self.collection.update_one(
+            {"_id": name},
+            {"$set": {"watermark": watermark}},
+            upsert=True
+        )
@@ -0,0 +1,110 @@
+import logging
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+
+from src.core.settings import settings
+from src.repository.mongo_client import mongo_client
+from src.schemas.product import Product
+
+logger = logging.getLogger(__name__)
+
+# Поля предложения, которые обычно совпадают у всех предложений одного поставщика
+SHARED_OFFER_FIELDS = ('stock', 'delivery_time', 'package_info', 'purchase_url')
+
+# Постоянные поля поставщика, которые хранятся в отдельной коллекции
+SUPPLIER_FIELDS = ('supplier_name', 'supplier_tel', 'supplier_address', 'supplier_description')
+
+
+def pack_suppliers(suppliers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Оставляет в товаре только ссылку на поставщика и данные предложений
+
+    Совпадающие у всех предложений поля выносятся на уровень поставщика.
+    """
+
+    packed = []
+
+    for supplier in suppliers:
+        offers = [dict(offer) for offer in supplier.get('supplier_offers', [])]
+        entry: Dict[str, Any] = {'dealer_id': supplier.get('dealer_id')}
+
+        for field in SHARED_OFFER_FIELDS:
+            values = {offer.get(field) for offer in offers}
+            if offers and len(values) == 1:
+                entry[field] = values.pop()
+                for offer in offers:
+                    offer.pop(field, None)
+
+        entry['supplier_offers'] = offers
+        packed.append(entry)
+
+    return packed
+
+
+def unpack_suppliers(packed: List[Dict[str, Any]], suppliers_by_id: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Восстанавливает полную форму поставщиков товара из нормализованной"""
+
+    unpacked = []
+
+    for entry in packed:
+        # Документы в старом формате уже содержат все поля
+        if 'supplier_name' in entry:
+            unpacked.append(entry)
+            continue
+
+        dealer_id = entry.get('dealer_id')
+        shared = {field: entry[field] for field in SHARED_OFFER_FIELDS if field in entry}
+        info = suppliers_by_id.get(dealer_id, {})
+
+        supplier = {'dealer_id': dealer_id}
+        supplier.update({field: info[field] for field in SUPPLIER_FIELDS if field in info})
+        supplier['supplier_offers'] = [{**shared, **offer} for offer in entry.get('supplier_offers', [])]
+
+        unpacked.append(supplier)
+
+    return unpacked
+
+
+class SupplierRepository:
+    """Коллекция поставщиков, на которую ссылаются товары по dealer_id"""
+
+    def __init__(self):
+        self._collection = None
+        self._known: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = mongo_client.get_collection(settings.suppliers_collection)
+        return self._collection
+
+    async def save_from_products(self, products: List[Product]):
+        """Сохраняет поставщиков из товаров; неизменившиеся повторно не пишутся"""
+
+        changed: Dict[str, Dict[str, Any]] = {}
+
+        for product in products:
+            for supplier in product.suppliers:
+                info = supplier.model_dump(include=set(SUPPLIER_FIELDS))
+                if self._known.get(supplier.dealer_id) != info:
+                    changed[supplier.dealer_id] = info
+
+        if not changed:
+            return
+
+        await self.collection.bulk_write([
+            UpdateOne({"_id": dealer_id}, {"$set": info}, upsert=True)
+            for dealer_id, info in changed.items()
+        ], ordered=False)
+
+        self._known.update(changed)
+        logger.info(f"Обновлены поставщики: {', '.join(changed)}")
+
+    async def load_all(self) -> Dict[str, Dict[str, Any]]:
+        """Загружает справочник поставщиков целиком (он небольшой)"""
+
+        suppliers = {}
+        async for document in self.collection.find({}):
+            suppliers[document.pop('_id')] = document
+
+        return suppliers
@@ -0,0 +1,209 @@
+import os
+import socket
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from src.core.settings import settings
+from src.repository.mongo_client import mongo_client
+
+logger = logging.getLogger(__name__)
+
+# Чем меньше приоритет, тем раньше задача выдается: сначала дочитываем
+# товары, затем страницы, затем новые категории — очередь не разрастается
+TASK_PRIORITIES = {
+    'product': 0,
+    'page': 1,
+    'category': 2,
+}
+
+
+class TaskQueue:
+    """Очередь задач краулера в MongoDB с арендой (lease), продлением и повторной выдачей
+
+    Задача выдается атомарным find_one_and_update: либо ожидающая, либо
+    аренда которой истекла (упавший воркер). Воркер продлевает аренду,
+    пока обрабатывает задачу, и отмечает ее выполненной или возвращает в очередь.
+    """
+
+    def __init__(self, worker_id: Optional[str] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = settings.queue_lease_seconds
+        self.max_attempts = settings.queue_max_attempts
+        self._collection = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = mongo_client.get_collection(settings.queue_collection)
+        return self._collection
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([("status", ASCENDING), ("priority", ASCENDING)])
+        await self.collection.create_index([("status", ASCENDING), ("lease_expires_at", ASCENDING)])
+        await self.collection.create_index([("status", ASCENDING), ("finished_at", ASCENDING)])
+
+    async def enqueue_many(self, kind: str, keys: List[str], payloads: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Добавляет задачи; уже существующие (в том числе выполненные в этом цикле) не дублируются"""
+
+        if not keys:
+            return
+
+        now = datetime.now(timezone.utc)
+        payloads = payloads or {}
+        operations = [
+            UpdateOne(
+                {"_id": f"{kind}:{key}"},
+                {"$setOnInsert": {
+                    "kind": kind,
+                    "key": key,
+                    "payload": payloads.get(key),
+                    "priority": TASK_PRIORITIES[kind],
+                    "status": "pending",
+                    "attempts": 0,
+                    "created_at": now,
+                }},
+                upsert=True
+            )
+            for key in keys
+        ]
+
+        try:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            logger.debug(f"Очередь: добавлено задач {kind}: {result.upserted_count}")
+
+        except BulkWriteError as e:
+            # Одновременный upsert одной задачи из двух воркеров — не ошибка
+            errors = [error for error in e.details.get('writeErrors', []) if error.get('code') != 11000]
+            if errors:
+                raise
+
+    async def lease(self) -> Optional[Dict[str, Any]]:
+        """Арендует следующую задачу: ожидающую или с истекшей арендой"""
+
+        now = datetime.now(timezone.utc)
+
+        return await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": "pending"},
+                # Упавший на задаче воркер не доходит до fail — лимит попыток проверяем здесь
+                {"status": "leased", "lease_expires_at": {"$lt": now}, "attempts": {"$lt": self.max_attempts}},
+            ]},
+            {
+                "$set": {
+                    "status": "leased",
+                    "owner": self.worker_id,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("priority", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def heartbeat(self, task: Dict[str, Any]) -> bool:
+        """Продлевает аренду; False, если задачу уже перехватил другой воркер"""
+
+        result = await self.collection.update_one(
+            {"_id": task["_id"], "owner": self.worker_id, "status": "leased"},
+            {"$set": {"lease_expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)}}
+        )
+        return result.matched_count == 1
+
+    async def complete(self, task: Dict[str, Any]):
+        await self.collection.update_one(
+            {"_id": task["_id"], "owner": self.worker_id},
+            {"$set": {"status": "done", "finished_at": datetime.now(timezone.utc)},
+             "$unset": {"owner": "", "lease_expires_at": ""}}
+        )
+
+    async def fail(self, task: Dict[str, Any], error: str):
+        """Возвращает задачу в очередь или окончательно помечает ее ошибочной"""
+
+        exhausted = task.get("attempts", 0) >= self.max_attempts
+        update = {"status": "failed", "finished_at": datetime.now(timezone.utc)} if exhausted else {"status": "pending"}
+        update["error"] = error
+
+        await self.collection.update_one(
+            {"_id": task["_id"], "owner": self.worker_id},
+            {"$set": update, "$unset": {"owner": "", "lease_expires_at": ""}}
+        )
+
+    async def fail_exhausted(self):
+        """Помечает ошибочными задачи с истекшей арендой, исчерпавшие попытки
+
+        Такие задачи, скорее всего, роняют воркер; без этого они навсегда
+        оставались бы арендованными и не давали начать новый цикл.
+        """
+
+        now = datetime.now(timezone.utc)
+        result = await self.collection.update_many(
+            {"status": "leased", "lease_expires_at": {"$lt": now}, "attempts": {"$gte": self.max_attempts}},
+            {
+                "$set": {
+                    "status": "failed",
+                    "finished_at": now,
+                    "error": "Аренда истекла после последней попытки",
+                },
+                "$unset": {"owner": "", "lease_expires_at": ""},
+            }
+        )
+
+        if result.modified_count:
+            logger.warning(f"Очередь: исчерпали попытки и помечены ошибочными {result.modified_count} задач")
+
+    async def has_unfinished(self) -> bool:
+        """Есть ли ожидающие или арендованные задачи"""
+
+        count = await self.collection.count_documents(
+            {"status": {"$in": ["pending", "leased"]}},
+            limit=1
+        )
+        return count > 0
+
+    async def last_finished_at(self) -> Optional[datetime]:
+        """Время завершения последней задачи — конец текущего цикла обхода"""
+
+        task = await self.collection.find_one(
+            {"status": {"$in": ["done", "failed"]}},
+            projection={"finished_at": 1},
+            sort=[("finished_at", DESCENDING)]
+        )
+        return task.get("finished_at") if task else None
+
+    async def recycle(self, idle: timedelta) -> bool:
+        """Начинает новый цикл обхода, если очередь пуста и с конца прошлого прошло не меньше idle
+
+        Категории снова ставятся в очередь, страницы и товары прошлого цикла удаляются.
+        Решение принимается по состоянию очереди, а не по часам воркера, поэтому
+        несколько воркеров не запускают цикл повторно.
+        """
+
+        if await self.has_unfinished():
+            return False
+
+        finished_at = await self.last_finished_at()
+        if finished_at is None:
+            return False
+
+        if finished_at.tzinfo is None:
+            finished_at = finished_at.replace(tzinfo=timezone.utc)
+        if datetime.now(timezone.utc) - finished_at < idle:
+            return False
+
+        finished = {"status": {"$in": ["done", "failed"]}}
+
+        deleted = await self.collection.delete_many({**finished, "kind": {"$ne": "category"}})
+        requeued = await self.collection.update_many(
+            {**finished, "kind": "category"},
+            {"$set": {"status": "pending", "attempts": 0}, "$unset": {"error": ""}}
+        )
+
+        logger.info(
+            f"Очередь: новый цикл, категорий в очереди {requeued.modified_count}, "
+            f"удалено старых задач {deleted.deleted_count}"
+        )
+        return True
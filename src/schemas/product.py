@@ -1,5 +1,6 @@
-from datetime import datetime
-from typing import List
+import hashlib
+from datetime import datetime, timezone
+from typing import List, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -27,9 +28,15 @@ class Supplier(BaseModel):
     supplier_offers: List[SupplierOffer] = Field(default_factory=list)
 
 
+AttributeValue = Union[float, str]
+
+
 class Attribute(BaseModel):
-    attr_name: str
-    attr_value: str
+    slug: str
+    name: str
+    unit: Optional[str] = None
+    # Число или строка; у многозначных характеристик — список
+    value: Union[AttributeValue, List[AttributeValue]]
 
 
 class Product(BaseModel):
@@ -43,5 +50,36 @@ class Product(BaseModel):
     created_at: str = Field(
         default_factory=lambda: datetime.now().strftime("%d.%m.%Y %H:%M")
     )
+    # Сортируемая метка последнего обновления (UTC) для инкрементальной выгрузки
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     attributes: List[Attribute] = Field(default_factory=list)
-    suppliers: List[Supplier] = Field(default_factory=list)
\ No newline at end of file
+    suppliers: List[Supplier] = Field(default_factory=list)
+    # Подписи карточки листинга, из которой товар был получен (см. ListingCard)
+    card_signature: Optional[str] = None
+    card_state: Optional[str] = None
+
+
+class ListingCard(BaseModel):
+    """Данные товара из карточки на странице листинга"""
+
+    product_id: str
+    url: str
+    title: str = ''
+    price: Optional[float] = None
+    gold_price: Optional[float] = None
+    stock: Optional[str] = None
+
+    @property
+    def is_complete(self) -> bool:
+        """Достаточно ли данных карточки, чтобы обновить товар без API"""
+        return bool(self.title) and bool(self.price)
+
+    @property
+    def signature(self) -> str:
+        """Подпись неизменной части карточки: тот ли это товар"""
+        return hashlib.md5(f"{self.product_id}|{self.title}".encode('utf-8')).hexdigest()[:16]
+
+    @property
+    def state(self) -> str:
+        """Подпись изменчивой части карточки: цены и наличие"""
+        return hashlib.md5(f"{self.price}|{self.gold_price}|{self.stock}".encode('utf-8')).hexdigest()[:16]
\ No newline at end of file
@@ -0,0 +1,10 @@
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ProductPage(BaseModel):
+    """Страница результатов запроса с курсором на следующую"""
+
+    items: List[Dict[str, Any]] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
@@ -0,0 +1,159 @@
+import os
+import json
+import zlib
+import socket
+import logging
+from functools import lru_cache
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from src.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveEntry(NamedTuple):
+    """Запись индекса архива: где лежит сжатое тело ответа"""
+
+    url: str
+    kind: str
+    fetched_at: str
+    segment: str
+    offset: int
+    length: int
+
+
+class ResponseArchive:
+    """Архив сырых ответов в append-only сегментах со сжатием и индексом смещений
+
+    Каждый процесс пишет в свои сегменты ``<writer>-<номер>.seg`` и свой индекс
+    ``<writer>.idx``, поэтому несколько краулеров могут делить один каталог.
+    Каждое тело сжимается отдельно, что позволяет читать записи по смещению.
+    """
+
+    def __init__(self, directory: Optional[str] = None, segment_max_bytes: Optional[int] = None):
+        self.directory = directory or settings.archive_dir
+        self.segment_max_bytes = segment_max_bytes or settings.archive_segment_max_mb * 1024 * 1024
+        self.writer_id = f"{socket.gethostname()}-{os.getpid()}"
+
+        self._segment_number = 0
+        self._segment_file = None
+        self._index_file = None
+
+    def append(self, url: str, body: str, kind: str) -> ArchiveEntry:
+        """Дописывает тело ответа в текущий сегмент и индекс"""
+
+        if self._segment_file is None:
+            self._open_writer()
+
+        data = zlib.compress(body.encode('utf-8'))
+
+        if self._segment_file.tell() > 0 and self._segment_file.tell() + len(data) > self.segment_max_bytes:
+            self._roll_segment()
+
+        entry = ArchiveEntry(
+            url=url,
+            kind=kind,
+            fetched_at=datetime.now(timezone.utc).isoformat(),
+            segment=os.path.basename(self._segment_file.name),
+            offset=self._segment_file.tell(),
+            length=len(data)
+        )
+
+        # Сначала данные, затем индекс: строка индекса не может ссылаться на недописанное тело
+        self._segment_file.write(data)
+        self._segment_file.flush()
+        self._index_file.write(json.dumps(entry._asdict(), ensure_ascii=False) + '\n')
+        self._index_file.flush()
+
+        return entry
+
+    def close(self):
+        """Закрывает файлы текущего писателя"""
+
+        if self._segment_file:
+            self._segment_file.close()
+            self._segment_file = None
+        if self._index_file:
+            self._index_file.close()
+            self._index_file = None
+
+    def iter_entries(self) -> Iterator[ArchiveEntry]:
+        """Последовательно читает индексы всех писателей"""
+
+        if not os.path.isdir(self.directory):
+            return
+
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith('.idx'):
+                continue
+
+            with open(os.path.join(self.directory, name), encoding='utf-8') as index_file:
+                for line in index_file:
+                    try:
+                        yield ArchiveEntry(**json.loads(line))
+                    except (ValueError, TypeError):
+                        # Оборванная последняя строка после аварийной остановки
+                        logger.warning(f"Пропущена поврежденная строка индекса в {name}")
+
+    def latest_entries(self, kind: Optional[str] = None) -> List[ArchiveEntry]:
+        """Возвращает самую свежую запись для каждого URL"""
+
+        latest: Dict[str, ArchiveEntry] = {}
+
+        for entry in self.iter_entries():
+            if kind and entry.kind != kind:
+                continue
+
+            current = latest.get(entry.url)
+            if current is None or entry.fetched_at > current.fetched_at:
+                latest[entry.url] = entry
+
+        return list(latest.values())
+
+    def read(self, entry: ArchiveEntry) -> str:
+        """Читает и распаковывает тело ответа по записи индекса"""
+
+        return read_archive_entry(self.directory, entry)
+
+    def _open_writer(self):
+        os.makedirs(self.directory, exist_ok=True)
+
+        existing = [
+            name for name in os.listdir(self.directory)
+            if name.startswith(f"{self.writer_id}-") and name.endswith('.seg')
+        ]
+        self._segment_number = len(existing)
+        self._roll_segment()
+
+        index_path = os.path.join(self.directory, f"{self.writer_id}.idx")
+        self._index_file = open(index_path, 'a', encoding='utf-8')
+
+        logger.info(f"Архив ответов: {self.directory}")
+
+    def _roll_segment(self):
+        if self._segment_file:
+            self._segment_file.close()
+
+        self._segment_number += 1
+        segment_path = os.path.join(self.directory, f"{self.writer_id}-{self._segment_number:06d}.seg")
+        self._segment_file = open(segment_path, 'ab')
+
+        logger.debug(f"Новый сегмент архива: {segment_path}")
+
+
+def read_archive_entry(directory: str, entry: ArchiveEntry) -> str:
+    """Читает запись архива без экземпляра ResponseArchive (для рабочих процессов)"""
+
+    with open(os.path.join(directory, entry.segment), 'rb') as segment_file:
+        segment_file.seek(entry.offset)
+        data = segment_file.read(entry.length)
+
+    return zlib.decompress(data).decode('utf-8')
+
+
+@lru_cache(maxsize=None)
+def get_response_archive() -> ResponseArchive:
+    """Общий архив процесса создается при первом обращении, а не при импорте модуля"""
+
+    return ResponseArchive()
@@ -0,0 +1,110 @@
+import os
+import json
+import asyncio
+import sqlite3
+import logging
+import tempfile
+from collections import deque
+from typing import Any, Dict, Optional
+
+from src.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SpillingFrontier:
+    """Очередь URL обхода с ограниченной частью в памяти и выгрузкой избытка на диск
+
+    Пока в памяти меньше memory_items элементов, они хранятся в deque; остальные
+    дописываются во временную SQLite-базу и подгружаются порциями по мере
+    освобождения места. Порядок FIFO сохраняется.
+    """
+
+    def __init__(self, memory_items: Optional[int] = None, spill_dir: Optional[str] = None):
+        self.memory_items = memory_items or settings.frontier_memory_items
+        self.spill_dir = spill_dir or settings.frontier_spill_dir
+
+        self._memory: deque = deque()
+        self._spilled = 0
+        self._connection = None
+        self._path = None
+
+        self._not_empty = asyncio.Event()
+        self._finished = False
+
+    def push(self, item: Dict[str, Any]):
+        # Пока на диске что-то есть, новые элементы тоже идут туда — иначе нарушится порядок
+        if self._spilled or len(self._memory) >= self.memory_items:
+            self._spill(item)
+        else:
+            self._memory.append(item)
+
+        self._not_empty.set()
+
+    def pop(self) -> Optional[Dict[str, Any]]:
+        if not self._memory and self._spilled:
+            self._load()
+
+        if not self._memory:
+            self._not_empty.clear()
+            return None
+
+        return self._memory.popleft()
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        """Ждет следующий элемент; None — очередь пуста и пополняться больше не будет"""
+
+        while True:
+            item = self.pop()
+            if item is not None:
+                return item
+
+            if self._finished:
+                return None
+
+            await self._not_empty.wait()
+
+    def finish(self):
+        """Отмечает, что новых элементов не будет"""
+
+        self._finished = True
+        self._not_empty.set()
+
+    def close(self):
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+        if self._path and os.path.exists(self._path):
+            os.remove(self._path)
+            self._path = None
+
+    def __len__(self) -> int:
+        return len(self._memory) + self._spilled
+
+    def _spill(self, item: Dict[str, Any]):
+        if self._connection is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            descriptor, self._path = tempfile.mkstemp(prefix='frontier-', suffix='.sqlite', dir=self.spill_dir)
+            os.close(descriptor)
+
+            self._connection = sqlite3.connect(self._path)
+            self._connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)")
+            logger.info(f"Очередь обхода переполнена, избыток выгружается в {self._path}")
+
+        self._connection.execute("INSERT INTO items (data) VALUES (?)", (json.dumps(item, ensure_ascii=False),))
+        self._spilled += 1
+
+    def _load(self):
+        """Подгружает с диска порцию размером в половину лимита памяти"""
+
+        rows = self._connection.execute(
+            "SELECT id, data FROM items ORDER BY id LIMIT ?",
+            (max(1, self.memory_items // 2),)
+        ).fetchall()
+
+        if rows:
+            self._connection.execute("DELETE FROM items WHERE id <= ?", (rows[-1][0],))
+            self._connection.commit()
+
+        self._memory.extend(json.loads(data) for _, data in rows)
+        self._spilled -= len(rows)
\ No newline at end of file
@@ -0,0 +1,202 @@
+import os
+import re
+import time
+import zlib
+import sqlite3
+import logging
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional
+
+from src.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse(NamedTuple):
+    """Сохраненный ответ и его валидаторы"""
+
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+    # False — ответ еще не подтвержден потребителем и не может считаться «неизменившимся»
+    confirmed: bool = True
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+class HttpCache:
+    """Постоянный HTTP-кэш на SQLite с TTL по шаблонам URL и ограничением размера
+
+    Свежие записи отдаются без запроса к сайту, устаревшие перепроверяются
+    условным запросом (If-None-Match / If-Modified-Since). При превышении
+    бюджета удаляются записи, к которым дольше всего не обращались.
+    """
+
+    def __init__(
+            self,
+            path: Optional[str] = None,
+            max_bytes: Optional[int] = None,
+            ttls: Optional[Dict[str, int]] = None,
+            default_ttl: Optional[int] = None
+    ):
+        self.path = path or settings.http_cache_path
+        self.max_bytes = max_bytes or settings.http_cache_max_mb * 1024 * 1024
+        self.default_ttl = settings.http_cache_default_ttl if default_ttl is None else default_ttl
+
+        self.ttls = [
+            (re.compile(pattern), ttl)
+            for pattern, ttl in (settings.http_cache_ttls if ttls is None else ttls).items()
+        ]
+
+        self._connection = None
+        self._total_bytes = 0
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connect()
+        return self._connection
+
+    def ttl_for(self, url: str) -> int:
+        """Возвращает TTL для URL: первый подходящий шаблон или TTL по умолчанию"""
+
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+
+        return self.default_ttl
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Возвращает запись из кэша и отмечает обращение к ней"""
+
+        row = self.connection.execute(
+            "SELECT body, etag, last_modified, expires_at, confirmed FROM responses WHERE url = ?",
+            (url,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        self.connection.execute(
+            "UPDATE responses SET accessed_at = ? WHERE url = ?",
+            (time.time(), url)
+        )
+        self.connection.commit()
+
+        body, etag, last_modified, expires_at, confirmed = row
+        return CachedResponse(
+            zlib.decompress(body).decode('utf-8'), etag, last_modified, expires_at, bool(confirmed)
+        )
+
+    def store(
+            self,
+            url: str,
+            body: str,
+            etag: Optional[str],
+            last_modified: Optional[str],
+            confirmed: bool = True
+    ):
+        """Сохраняет ответ 200 вместе с валидаторами
+
+        С confirmed=False запись ждет вызова confirm: до этого ответ отдается
+        как измененный, даже если сайт вернул 304.
+        """
+
+        data = zlib.compress(body.encode('utf-8'))
+        now = time.time()
+
+        previous = self.connection.execute(
+            "SELECT size FROM responses WHERE url = ?", (url,)
+        ).fetchone()
+
+        self.connection.execute(
+            "INSERT OR REPLACE INTO responses "
+            "(url, body, etag, last_modified, expires_at, accessed_at, size, confirmed) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, data, etag, last_modified, now + self.ttl_for(url), now, len(data), int(confirmed))
+        )
+        self.connection.commit()
+
+        self._total_bytes += len(data) - (previous[0] if previous else 0)
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def refresh(self, url: str):
+        """Продлевает срок жизни записи после ответа 304"""
+
+        now = time.time()
+        self.connection.execute(
+            "UPDATE responses SET expires_at = ?, accessed_at = ? WHERE url = ?",
+            (now + self.ttl_for(url), now, url)
+        )
+        self.connection.commit()
+
+    def confirm(self, url: str):
+        """Отмечает, что ответ обработан и сохранен потребителем"""
+
+        self.connection.execute("UPDATE responses SET confirmed = 1 WHERE url = ?", (url,))
+        self.connection.commit()
+
+    def close(self):
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connection = sqlite3.connect(self.path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT, last_modified TEXT, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL, "
+            "confirmed INTEGER NOT NULL DEFAULT 1)"
+        )
+
+        # Кэш, созданный до появления подтверждений
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(responses)")}
+        if 'confirmed' not in columns:
+            self._connection.execute("ALTER TABLE responses ADD COLUMN confirmed INTEGER NOT NULL DEFAULT 1")
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+        )
+        self._connection.commit()
+
+        self._total_bytes = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+        logger.info(f"HTTP-кэш: {self.path} ({self._total_bytes // 1024} КБ)")
+
+    def _evict(self):
+        """Удаляет давно не использованные записи до 90% бюджета"""
+
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+
+        rows = self.connection.execute(
+            "SELECT url, size FROM responses ORDER BY accessed_at"
+        ).fetchall()
+
+        for url, size in rows:
+            if self._total_bytes <= target:
+                break
+            self.connection.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self._total_bytes -= size
+            evicted += 1
+
+        self.connection.commit()
+        logger.info(f"HTTP-кэш: удалено записей {evicted}, размер {self._total_bytes // 1024} КБ")
+
+
+@lru_cache(maxsize=None)
+def get_http_cache() -> HttpCache:
+    """Общий кэш процесса создается при первом обращении, а не при импорте модуля"""
+
+    return HttpCache()
@@ -1,15 +1,53 @@
-from typing import Optional
+import asyncio
+from contextlib import nullcontext
+from typing import NamedTuple, Optional
 
 import httpx
 import logging
 
+from src.core.settings import settings
+from src.scrapers.archive import get_response_archive
+from src.scrapers.http_cache import get_http_cache
+
 logger = logging.getLogger(__name__)
 
 
+class ScrapeResult(NamedTuple):
+    """Тело ответа и признак того, что оно не менялось с прошлой загрузки"""
+
+    text: str
+    not_modified: bool = False
+
+
 class PageScraper:
 
+    # Число сетевых запросов всех экземпляров (ответы из свежего кэша не считаются)
+    request_count = 0
+
+    # Общий для всех экземпляров лимит одновременно загружаемых тел ответов
+    _body_slots: Optional[asyncio.Semaphore] = None
+
+    def __init__(self):
+        self.archive = get_response_archive() if settings.archive_enabled else None
+        self.cache = get_http_cache() if settings.http_cache_enabled else None
+
     async def scrape_page(self, url: str) -> Optional[str]:
 
+        result = await self.fetch(url)
+        return result.text if result else None
+
+    async def fetch(self, url: str, confirm_later: bool = False) -> Optional[ScrapeResult]:
+        """Загружает страницу с учетом HTTP-кэша
+
+        С confirm_later=True новый ответ считается неизменившимся на следующих
+        загрузках только после вызова confirm(url) — когда результат сохранен.
+        """
+
+        cached = self.cache.get(url) if self.cache else None
+        if cached and cached.is_fresh:
+            logger.debug(f"Ответ из кэша: {url}")
+            return ScrapeResult(cached.body, not_modified=cached.confirmed)
+
         headers = {
             "Accept": "application/json, text/plain, */*",
             "Accept-Language": "ru,en;q=0.9",
@@ -26,6 +64,12 @@ class PageScraper:
             "x-requested-with": "XmlHttpRequest"
         }
 
+        # Условный запрос: сайт ответит 304, если содержимое не менялось
+        if cached and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
         cookies = {
             "ipp_uid": "1754493585232/cG8B1jnMptHWCQwJ/WolH2e1EeqAflCPwkwQvSQ==",
             "SIK": "hgAAALyMNj63g7EXHhENAA",
@@ -52,10 +96,61 @@ class PageScraper:
             "directCrm-session": "%7B%22deviceGuid%22%3A%22ad4914dc-6a56-4297-b93d-7c95869f04d4%22%7D"
         }
 
-        async with httpx.AsyncClient(follow_redirects = True, timeout = 30) as client:
+        PageScraper.request_count += 1
+
+        async with self._body_slot(), httpx.AsyncClient(follow_redirects = True, timeout = 30) as client:
             try:
                 response = await client.get(url, headers=headers, cookies=cookies)
-                return response.text
+
+                if cached and response.status_code == 304:
+                    logger.debug(f"Не изменилась (304): {url}")
+                    self.cache.refresh(url)
+                    return ScrapeResult(cached.body, not_modified=cached.confirmed)
+
+                if response.status_code == 200:
+                    if self.archive:
+                        self._archive_response(url, response)
+                    if self.cache:
+                        self.cache.store(
+                            url,
+                            response.text,
+                            response.headers.get('etag'),
+                            response.headers.get('last-modified'),
+                            confirmed=not confirm_later
+                        )
+
+                return ScrapeResult(response.text)
             except Exception as e:
                 logger.error(f"Ошибка при получении html: {e}")
                 return None
+
+    def confirm(self, url: str):
+        """Подтверждает ответ, загруженный с confirm_later=True"""
+
+        if self.cache:
+            self.cache.confirm(url)
+
+    @classmethod
+    def _body_slot(cls):
+        """В режиме ограниченной памяти число тел ответов в работе не превышает бюджет"""
+
+        if not settings.memory_bounded:
+            return nullcontext()
+
+        if cls._body_slots is None:
+            slots = max(1, settings.memory_budget_mb * 1024 // max(settings.memory_body_estimate_kb, 1))
+            cls._body_slots = asyncio.Semaphore(slots)
+            logger.info(f"Одновременных загрузок не больше {slots}")
+
+        return cls._body_slots
+
+    def _archive_response(self, url: str, response: httpx.Response):
+        """Сохраняет сырой ответ в архив"""
+
+        content_type = response.headers.get('content-type', '')
+        kind = 'json' if 'json' in content_type else 'html'
+
+        try:
+            self.archive.append(url, response.text, kind)
+        except OSError as e:
+            logger.error(f"Ошибка записи в архив: {e}")
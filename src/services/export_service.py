@@ -0,0 +1,130 @@
+import sys
+import csv
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, TextIO
+
+from src.core.settings import settings
+from src.repository.mongo_client import mongo_client
+from src.repository.repository import ExportStateRepository, ProductRepository
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIELDS = [
+    'article', 'title', 'description', 'brand', 'country_of_origin', 'warranty_months',
+    'category', 'created_at', 'updated_at', 'attributes', 'suppliers'
+]
+
+
+def _json_default(value: Any) -> str:
+    """Сериализует datetime и ObjectId"""
+
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class ExportService:
+    """Потоковая (в том числе инкрементальная) выгрузка коллекции товаров в JSONL или CSV"""
+
+    def __init__(self):
+        self.repository = ProductRepository()
+        self.state_repository = ExportStateRepository()
+
+    async def export(
+            self,
+            output: str = '-',
+            output_format: str = 'jsonl',
+            fields: Optional[List[str]] = None,
+            incremental: bool = False,
+            name: str = 'default'
+    ):
+        """Выгружает товары; в инкрементальном режиме — только обновленные после водяного знака"""
+
+        if output_format not in ('jsonl', 'csv'):
+            raise ValueError(f"Неизвестный формат выгрузки: {output_format}")
+
+        fields = fields or DEFAULT_FIELDS
+        if 'updated_at' not in fields:
+            fields = fields + ['updated_at']
+
+        # Проекция: только нужные поля, без _id
+        projection = {field: 1 for field in fields}
+        projection['_id'] = 0
+
+        try:
+            await mongo_client.connect()
+
+            # Поставщики и названия атрибутов хранятся отдельно — выгружаем товары в полной форме
+            await self.repository.load_dictionaries()
+
+            since = await self.state_repository.get_watermark(name) if incremental else None
+            until = datetime.now(timezone.utc) - timedelta(seconds=settings.export_safety_lag_seconds)
+
+            if since:
+                logger.info(f"Инкрементальная выгрузка '{name}' с {since.isoformat()}")
+            else:
+                logger.info(f"Полная выгрузка '{name}'")
+
+            stream = sys.stdout if output == '-' else open(output, 'w', encoding='utf-8', newline='')
+            try:
+                count, watermark = await self._write(stream, output_format, fields, projection, since, until)
+            finally:
+                if stream is not sys.stdout:
+                    stream.close()
+
+            # Водяной знак сдвигаем только после успешной записи всего файла
+            if incremental and watermark:
+                await self.state_repository.set_watermark(name, watermark)
+
+            logger.info(f"Выгружено товаров: {count}")
+
+        except Exception as e:
+            logger.error(f"Ошибка выгрузки: {e}")
+            # Выгрузку запускают по расписанию — сбой должен давать ненулевой код выхода
+            raise
+        finally:
+            await mongo_client.disconnect()
+
+    async def _write(
+            self,
+            stream: TextIO,
+            output_format: str,
+            fields: List[str],
+            projection: Dict[str, int],
+            since: Optional[datetime],
+            until: datetime
+    ):
+        count = 0
+        watermark = None
+
+        writer = None
+        if output_format == 'csv':
+            writer = csv.writer(stream)
+            writer.writerow(fields)
+
+        async for document in self.repository.iter_products(since=since, until=until, projection=projection):
+            document = self.repository.expand_document(document)
+
+            if writer:
+                writer.writerow([self._csv_value(document.get(field)) for field in fields])
+            else:
+                stream.write(json.dumps(document, ensure_ascii=False, default=_json_default))
+                stream.write('\n')
+
+            count += 1
+            watermark = document.get('updated_at') or watermark
+
+        return count, watermark
+
+    def _csv_value(self, value: Any) -> str:
+        """Вложенные значения в CSV записываются как JSON"""
+
+        if value is None:
+            return ''
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, ensure_ascii=False, default=_json_default)
+        return str(value)
\ No newline at end of file
@@ -1,11 +1,15 @@
 import asyncio
 import logging
+from typing import List, Optional
 
+from src.core.settings import settings
 from src.parsers.start_page import StartPageParser
 from src.parsers.category import CategoryPageParser
 from src.parsers.product_page import ProductPropertyParser
-from src.repository.mongo_client import mongo_client
-from src.repository.repository import ProductRepository
+from src.schemas.product import ListingCard, Product
+from src.scrapers.frontier import SpillingFrontier
+from src.sinks.base import ProductSink
+from src.sinks.factory import create_sink
 
 logger = logging.getLogger(__name__)
 
@@ -13,12 +17,12 @@ logger = logging.getLogger(__name__)
 class ParserService:
     """Сервис для парсинга товаров с сайта Петрович"""
 
-    def __init__(self):
+    def __init__(self, sink: Optional[ProductSink] = None):
 
         self.start_parser = StartPageParser()
         self.category_parser = CategoryPageParser()
         self.product_parser = ProductPropertyParser()
-        self.repository = ProductRepository()
+        self.sink = sink or create_sink()
 
         # Задержки между запросами
         self.delay_between_requests = 0.5
@@ -30,8 +34,8 @@ class ParserService:
         try:
             logger.info("Запуск парсинга Петрович")
 
-            # Подключаемся к MongoDB
-            await mongo_client.connect()
+            # Открываем приемник результатов
+            await self.sink.open()
 
             # Получаем список категорий
             logger.info("Получение списка категорий")
@@ -52,7 +56,7 @@ class ParserService:
         except Exception as e:
             logger.error(f"Критическая ошибка в парсинге: {e}")
         finally:
-            await mongo_client.disconnect()
+            await self.sink.close()
 
     async def parse_single_category(self, category_url: str):
         """Парсит одну категорию"""
@@ -60,8 +64,8 @@ class ParserService:
         try:
             logger.info(f"Парсинг категории: {category_url}")
 
-            # Подключаемся к MongoDB
-            await mongo_client.connect()
+            # Открываем приемник результатов
+            await self.sink.open()
 
             # Обрабатываем категорию
             await self._process_category(category_url)
@@ -71,11 +75,15 @@ class ParserService:
         except Exception as e:
             logger.error(f"Ошибка при парсинге категории: {e}")
         finally:
-            await mongo_client.disconnect()
+            await self.sink.close()
 
     async def _process_category(self, category_url: str):
         """Обрабатывает одну категорию"""
 
+        if settings.memory_bounded:
+            await self._process_category_bounded(category_url)
+            return
+
         try:
             # Получаем все страницы категории
             page_links = await self.category_parser.create_page_links(category_url)
@@ -85,13 +93,13 @@ class ParserService:
             for page_num, page_url in enumerate(page_links, 1):
                 logger.info(f"Обработка страницы {page_num}/{len(page_links)}")
 
-                # Получаем товары со страницы
-                product_links = await self.category_parser.get_product_links(page_url)
-                logger.info(f"Найдено товаров на странице: {len(product_links)}")
+                # Получаем карточки товаров со страницы
+                cards = await self.category_parser.get_product_cards(page_url)
+                logger.info(f"Найдено товаров на странице: {len(cards)}")
 
-                # Парсим товары со страницы
-                for product_url in product_links:
-                    await self._process_product(product_url)
+                # Через API парсим только товары, которые не удалось обновить по карточкам
+                for card in await self._apply_cards(cards):
+                    await self._process_product(card.url, card)
                     await asyncio.sleep(self.delay_between_requests)
 
             logger.info("Категория обработана")
@@ -99,19 +107,137 @@ class ParserService:
         except Exception as e:
             logger.error(f"Ошибка при обработке категории {category_url}: {e}")
 
-    async def _process_product(self, product_url: str):
-        """Обрабатывает один товар"""
+    async def _process_category_bounded(self, category_url: str):
+        """Обрабатывает категорию в режиме ограниченной памяти
+
+        Ссылки на страницы выдаются генератором, карточки товаров копятся в очереди
+        с выгрузкой избытка на диск, а товары из нее параллельно разбирают
+        несколько обработчиков.
+        """
+
+        frontier = SpillingFrontier()
+        consumers = [
+            asyncio.create_task(self._consume_frontier(frontier))
+            for _ in range(max(1, settings.crawl_concurrency))
+        ]
 
         try:
-            # Парсим товар
-            product = await self.product_parser.parse_product(product_url)
+            page_count = await self.category_parser.get_page_count(category_url)
+            logger.info(f"Найдено страниц: {page_count}")
 
-            if product:
-                # Сохраняем в базу данных
-                await self.repository.save_product(product)
-                logger.info(f"Сохранен товар: {product.article}")
+            page_links = self.category_parser.iter_page_links(category_url, page_count)
+            for page_num, page_url in enumerate(page_links, 1):
+                logger.info(f"Обработка страницы {page_num}/{page_count}, товаров в очереди: {len(frontier)}")
+
+                cards = await self.category_parser.get_product_cards(page_url)
+                logger.info(f"Найдено товаров на странице: {len(cards)}")
+
+                for card in await self._apply_cards(cards):
+                    frontier.push(card.model_dump())
+
+            frontier.finish()
+            await asyncio.gather(*consumers)
+
+            logger.info("Категория обработана")
+
+        except Exception as e:
+            logger.error(f"Ошибка при обработке категории {category_url}: {e}")
+        finally:
+            for consumer in consumers:
+                consumer.cancel()
+            await asyncio.gather(*consumers, return_exceptions=True)
+            frontier.close()
+
+    async def _consume_frontier(self, frontier: SpillingFrontier):
+        """Обработчик товаров из очереди категории"""
+
+        while (item := await frontier.get()) is not None:
+            card = ListingCard(**item)
+            await self._process_product(card.url, card)
+            await asyncio.sleep(self.delay_between_requests)
+
+    async def _apply_cards(self, cards: List[ListingCard]) -> List[ListingCard]:
+        """Обновляет известные товары по карточкам листинга, возвращает карточки для запроса к API"""
+
+        if not settings.listing_card_updates or not cards:
+            return cards
+
+        complete = [card for card in cards if card.is_complete]
+        known = await self.sink.lookup_cards([card.product_id for card in complete]) if complete else {}
+
+        updates = []
+        remaining = []
+
+        for card in cards:
+            stored = known.get(card.product_id)
+
+            # Тот же товар, что уже сохранен: достаточно цен и наличия из карточки
+            if card.is_complete and stored and stored.get('card_signature') == card.signature:
+                if stored.get('card_state') != card.state:
+                    updates.append(card)
+                self._on_card(card)
             else:
-                logger.warning(f"Не удалось спарсить товар: {product_url}")
+                remaining.append(card)
+
+        await self.sink.write_cards(updates)
+
+        logger.info(
+            f"По карточкам: без изменений {len(cards) - len(remaining) - len(updates)}, "
+            f"обновлено {len(updates)}, запрос к API {len(remaining)}"
+        )
+        return remaining
+
+    async def _process_product(self, product_url: str, card: Optional[ListingCard] = None) -> bool:
+        """Обрабатывает один товар, возвращает False при неудаче"""
+
+        try:
+            # Карточка пришла сюда, а не обновила товар — значит, сохраненной подписи нет
+            # или она другая (товар до появления подписей, переименованный товар).
+            # Такой товар разбираем и при неизменном ответе API, чтобы записать подпись
+            needs_signature = (
+                card is not None
+                and card.is_complete
+                and settings.listing_card_updates
+                and self.sink.supports_cards
+            )
+
+            # Парсим товар, если ответ API изменился с прошлой загрузки
+            changed, product = await self.product_parser.parse_product_if_changed(
+                product_url,
+                skip_unchanged=settings.skip_unchanged_products and not needs_signature
+            )
+
+            # Запоминаем карточку, чтобы в следующий раз обновить товар без API; подписи
+            # проставляются до _on_product, чтобы обработчики видели то же, что card.state
+            if product and card:
+                product.card_signature = card.signature
+                product.card_state = card.state
+
+            self._on_product(product_url, changed, product)
+
+            if not changed:
+                return True
+
+            if product:
+                # Передаем в приемник результатов; неизменившийся ответ API пропускается
+                # в следующий раз, только если товар действительно сохранен
+                await self.sink.write(product)
+                self.sink.on_commit(lambda: self._confirm_product(product_url))
+                logger.info(f"Записан товар: {product.article}")
+                return True
+
+            logger.warning(f"Не удалось спарсить товар: {product_url}")
+            return False
 
         except Exception as e:
-            logger.error(f"Ошибка при обработке товара {product_url}: {e}")
\ No newline at end of file
+            logger.error(f"Ошибка при обработке товара {product_url}: {e}")
+            return False
+
+    async def _confirm_product(self, product_url: str):
+        self.product_parser.confirm_product(product_url)
+
+    def _on_product(self, product_url: str, changed: bool, product: Optional[Product]):
+        """Точка расширения: вызывается для каждого обработанного товара"""
+
+    def _on_card(self, card: ListingCard):
+        """Точка расширения: вызывается для товара, обработанного по карточке листинга"""
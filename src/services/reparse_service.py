@@ -0,0 +1,101 @@
+import os
+import json
+import asyncio
+import logging
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from src.core.settings import settings
+from src.parsers.product_page import ProductPropertyParser
+from src.schemas.product import Product
+from src.scrapers.archive import ArchiveEntry, ResponseArchive, read_archive_entry
+from src.sinks.base import ProductSink
+from src.sinks.factory import create_sink
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_chunk(archive_dir: str, entries: List[ArchiveEntry]) -> List[Product]:
+    """Разбирает пачку записей архива в рабочем процессе"""
+
+    parser = ProductPropertyParser()
+    products = []
+
+    for entry in entries:
+        try:
+            json_data = json.loads(read_archive_entry(archive_dir, entry))
+        except (OSError, ValueError) as e:
+            logger.error(f"Не удалось прочитать запись архива {entry.url}: {e}")
+            continue
+
+        product_url = parser.product_url_from_api_url(entry.url) or entry.url
+        product = parser.parse_product_data(json_data, product_url)
+        if product:
+            products.append(product)
+
+    return products
+
+
+class ReparseService:
+    """Сервис повторного разбора архива ответов без обращения к сайту"""
+
+    def __init__(self, archive: Optional[ResponseArchive] = None, sink: Optional[ProductSink] = None):
+
+        self.archive = archive or ResponseArchive()
+        self.sink = sink or create_sink()
+
+        self.workers = settings.reparse_workers or os.cpu_count() or 1
+        self.chunk_size = settings.reparse_chunk_size
+        self.max_in_flight = self.workers * 2
+
+    async def reparse(self):
+        """Прогоняет последние ответы API из архива через парсер и пишет результат в приемник"""
+
+        try:
+            logger.info(f"Повторный разбор архива: {self.archive.directory}")
+
+            await self.sink.open()
+
+            entries = self.archive.latest_entries(kind='json')
+            logger.info(f"Записей в архиве для разбора: {len(entries)}")
+
+            total = (len(entries) + self.chunk_size - 1) // self.chunk_size
+            chunks = (
+                entries[i:i + self.chunk_size]
+                for i in range(0, len(entries), self.chunk_size)
+            )
+
+            loop = asyncio.get_running_loop()
+            saved = 0
+            done = 0
+
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                # Держим в работе ограниченное число пачек: готовые товары не копятся в памяти,
+                # если приемник пишет медленнее, чем процессы разбирают
+                in_flight = set()
+
+                def submit(count: int):
+                    for chunk in itertools.islice(chunks, count):
+                        in_flight.add(loop.run_in_executor(pool, _parse_chunk, self.archive.directory, chunk))
+
+                submit(self.max_in_flight)
+
+                # Пишем пачки по мере готовности, пока процессы разбирают следующие
+                while in_flight:
+                    finished, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    submit(len(finished))
+
+                    for future in finished:
+                        products = future.result()
+                        await self.sink.write_many(products)
+                        saved += len(products)
+                        done += 1
+                        logger.info(f"Разобрано пачек {done}/{total}, товаров: {saved}")
+
+            logger.info(f"Повторный разбор завершен, товаров: {saved}")
+
+        except Exception as e:
+            logger.error(f"Ошибка повторного разбора архива: {e}")
+        finally:
+            await self.sink.close()
\ No newline at end of file
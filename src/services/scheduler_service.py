@@ -0,0 +1,269 @@
+import re
+import math
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from src.core.settings import settings
+from src.repository.category_stats import CategoryStatsRepository
+from src.repository.mongo_client import mongo_client
+from src.schemas.product import ListingCard, Product
+from src.scrapers.scraper import PageScraper
+from src.services.parser_service import ParserService
+from src.sinks.base import ProductSink
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerService(ParserService):
+    """Долгоживущий режим: повторно обходит категории в порядке ожидаемой пользы
+
+    Для каждой категории хранится сглаженная частота изменений (доля товаров,
+    меняющихся за час) и стоимость обхода в запросах. Следующей обходится
+    категория с наибольшим ожидаемым числом изменений на один запрос, при
+    этом общее число запросов в час ограничено бюджетом (token bucket).
+    """
+
+    def __init__(self, sink: Optional[ProductSink] = None):
+        super().__init__(sink)
+
+        self.stats_repository = CategoryStatsRepository()
+
+        self.budget_per_hour = settings.scheduler_requests_per_hour
+        self.min_interval_hours = settings.scheduler_min_interval_hours
+        self.max_interval_hours = settings.scheduler_max_interval_hours
+        self.initial_change_rate = settings.scheduler_initial_change_rate
+        self.smoothing = settings.scheduler_smoothing
+        self.category_refresh_hours = settings.scheduler_category_refresh_hours
+
+        # Пауза после ошибки итерации, удваивается при повторных ошибках
+        self.retry_delay = 30.0
+        self.max_retry_delay = 900.0
+
+        self.tokens = float(self.budget_per_hour)
+        self._last_refill = time.monotonic()
+
+        self._categories = []
+        self._categories_loaded_at = 0.0
+        self._current: Dict[str, Optional[str]] = {}
+
+    async def run(self, base_url: str = "https://moscow.petrovich.ru/catalog/"):
+        """Бесконечный цикл планирования обходов"""
+
+        try:
+            logger.info(f"Запуск планировщика, бюджет {self.budget_per_hour} запросов в час")
+
+            await mongo_client.connect()
+            await self.sink.open()
+
+            failures = 0
+            while True:
+                # Ошибка одной итерации (сеть, MongoDB) не останавливает долгоживущий режим
+                try:
+                    await self._step(base_url)
+                    failures = 0
+                except Exception as e:
+                    failures += 1
+                    wait = min(self.retry_delay * 2 ** (failures - 1), self.max_retry_delay)
+                    logger.error(f"Ошибка итерации планировщика: {e}, повтор через {wait:.0f} с")
+                    await asyncio.sleep(wait)
+
+        except Exception as e:
+            logger.error(f"Критическая ошибка планировщика: {e}")
+        finally:
+            await self.sink.close()
+            await mongo_client.disconnect()
+
+    async def _step(self, base_url: str):
+        """Одна итерация: выбирает категорию и обходит ее, если позволяет бюджет"""
+
+        await self._refresh_categories(base_url)
+        stats = await self.stats_repository.load_all()
+
+        choice = self._choose(stats, time.time())
+        if choice is None:
+            logger.debug("Нет категорий, которые пора обходить")
+            await asyncio.sleep(60)
+            return
+
+        category_url, estimated_cost = choice
+
+        self._refill()
+        if self.tokens < estimated_cost:
+            wait = (estimated_cost - self.tokens) * 3600 / self.budget_per_hour
+            logger.info(f"Бюджет запросов исчерпан, ожидание {wait:.0f} с")
+            await asyncio.sleep(min(wait, 300))
+            return
+
+        await self._crawl(category_url, stats.get(category_url))
+        await asyncio.sleep(self.delay_between_categories)
+
+    async def _refresh_categories(self, base_url: str):
+        """Периодически обновляет список категорий со стартовой страницы"""
+
+        if self._categories and time.monotonic() - self._categories_loaded_at < self.category_refresh_hours * 3600:
+            return
+
+        try:
+            categories = await self.start_parser.get_categories(base_url)
+        except Exception as e:
+            logger.error(f"Ошибка обновления списка категорий: {e}")
+            categories = []
+
+        if categories:
+            self._categories = categories
+            self._categories_loaded_at = time.monotonic()
+        elif self._categories:
+            # Работаем по прежнему списку, повторим при следующей итерации
+            logger.warning("Список категорий не получен, используется прежний")
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            float(self.budget_per_hour),
+            self.tokens + (now - self._last_refill) * self.budget_per_hour / 3600
+        )
+        self._last_refill = now
+
+    def _choose(self, stats: Dict[str, Dict[str, Any]], now: float) -> Optional[Tuple[str, float]]:
+        """Выбирает категорию с наибольшей ожидаемой пользой на запрос"""
+
+        best = None
+        best_score = 0.0
+
+        for category_url in self._categories:
+            score = self._score(stats.get(category_url), now)
+            if score is not None and (best is None or score > best_score):
+                best, best_score = category_url, score
+
+        if best is None:
+            return None
+
+        category_stats = stats.get(best)
+        cost = category_stats.get('cost', 1) if category_stats else 1
+        # Категория дороже часового бюджета все равно должна когда-то обходиться
+        return best, min(float(cost), float(self.budget_per_hour))
+
+    def _score(self, category_stats: Optional[Dict[str, Any]], now: float) -> Optional[float]:
+        # Новые категории обходим в первую очередь
+        if not category_stats or not category_stats.get('last_crawl_ts'):
+            return math.inf
+
+        hours = (now - category_stats['last_crawl_ts']) / 3600
+        if hours < self.min_interval_hours:
+            return None
+
+        if hours >= self.max_interval_hours:
+            return 1e9 + hours
+
+        # Ожидаемое число изменившихся товаров при пуассоновской модели изменений
+        rate = category_stats.get('change_rate', self.initial_change_rate)
+        expected_changes = category_stats.get('products', 0) * (1 - math.exp(-rate * hours))
+
+        return expected_changes / max(category_stats.get('cost', 1), 1)
+
+    async def _crawl(self, category_url: str, previous: Optional[Dict[str, Any]]):
+        """Обходит категорию и обновляет ее статистику"""
+
+        previous_snapshot = await self.stats_repository.get_snapshot(category_url)
+
+        self._current = {}
+        requests_before = PageScraper.request_count
+        started = time.time()
+
+        logger.info(f"Обход категории: {category_url}")
+        await self._process_category(category_url)
+        # Сохраняем буфер MongoDB; файловые приемники сами решают, когда писать
+        await self.sink.commit()
+
+        spent = PageScraper.request_count - requests_before
+        self._refill()
+        self.tokens -= spent
+
+        snapshot = {}
+        for product_url, signature in self._current.items():
+            key = self._product_key(product_url)
+            # Неизменившийся ответ — подпись с прошлого обхода
+            snapshot[key] = signature if signature is not None else previous_snapshot.get(key, '')
+
+        if not snapshot and previous_snapshot:
+            # Скорее всего обход не удался — не портим оценку частоты изменений
+            logger.warning(f"Категория {category_url} не вернула товаров, статистика не обновлена")
+            await self.stats_repository.save(category_url, {'last_crawl_ts': started}, previous_snapshot)
+            return
+
+        stats = self._update_stats(previous, previous_snapshot, snapshot, started, spent)
+        await self.stats_repository.save(category_url, stats, snapshot)
+
+        logger.info(
+            f"Категория обработана: товаров {stats['products']}, запросов {spent}, "
+            f"обновлений цен {stats['price_change_rate']:.1%}, оборот ассортимента {stats['churn']:.1%}, "
+            f"частота изменений {stats['change_rate']:.4f}/ч"
+        )
+
+    def _update_stats(
+            self,
+            previous: Optional[Dict[str, Any]],
+            previous_snapshot: Dict[str, str],
+            snapshot: Dict[str, str],
+            started: float,
+            spent: int
+    ) -> Dict[str, Any]:
+        before, after = set(previous_snapshot), set(snapshot)
+        union, common = before | after, before & after
+
+        added = len(after - before)
+        removed = len(before - after)
+        price_changed = sum(1 for key in common if previous_snapshot[key] != snapshot[key])
+
+        churn = (added + removed) / max(len(union), 1)
+        price_change_rate = price_changed / max(len(common), 1)
+
+        if previous and previous.get('last_crawl_ts') and previous_snapshot:
+            hours = max((started - previous['last_crawl_ts']) / 3600, 1 / 60)
+            fraction = min((added + removed + price_changed) / max(len(union), 1), 0.99)
+            # Оценка интенсивности по доле изменившихся за интервал: f = 1 - exp(-rate * t)
+            observed_rate = -math.log(1 - fraction) / hours
+            change_rate = self.smoothing * observed_rate + (1 - self.smoothing) * previous.get(
+                'change_rate', self.initial_change_rate
+            )
+        else:
+            change_rate = self.initial_change_rate
+
+        return {
+            'last_crawl_ts': started,
+            'change_rate': change_rate,
+            'cost': max(spent, 1),
+            'products': len(snapshot),
+            'churn': churn,
+            'price_change_rate': price_change_rate,
+            'crawls': (previous or {}).get('crawls', 0) + 1,
+        }
+
+    def _on_product(self, product_url: str, changed: bool, product: Optional[Product]):
+        # None — ответ не изменился или не разобран: берем подпись с прошлого обхода
+        if product:
+            self._current[product_url] = product.card_state or self._signature(product)
+        else:
+            self._current[product_url] = None
+
+    def _on_card(self, card: ListingCard):
+        self._current[card.url] = card.state
+
+    def _signature(self, product: Product) -> str:
+        """Подпись цен и наличия товара"""
+
+        offers = [
+            [[price.price for price in offer.price], offer.stock]
+            for supplier in product.suppliers
+            for offer in supplier.supplier_offers
+        ]
+        return hashlib.md5(json.dumps(offers, ensure_ascii=False).encode('utf-8')).hexdigest()[:12]
+
+    def _product_key(self, product_url: str) -> str:
+        # Ключи снимка не могут содержать точки — берем ID товара
+        match = re.search(r'/product/(\d+)', product_url)
+        return match.group(1) if match else hashlib.md5(product_url.encode('utf-8')).hexdigest()
\ No newline at end of file
@@ -0,0 +1,192 @@
+import time
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from src.core.settings import settings
+from src.repository.mongo_client import mongo_client
+from src.repository.task_queue import TaskQueue
+from src.schemas.product import ListingCard
+from src.services.parser_service import ParserService
+from src.sinks.base import ProductSink
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerService(ParserService):
+    """Воркер распределенного обхода: берет категории, страницы и товары из общей очереди
+
+    Несколько контейнеров делят каталог между собой через TaskQueue,
+    упавший воркер теряет аренду и его задачи выдаются повторно.
+    """
+
+    def __init__(self, sink: Optional[ProductSink] = None, queue: Optional[TaskQueue] = None):
+        super().__init__(sink)
+
+        self.queue = queue or TaskQueue()
+        self.poll_seconds = settings.queue_poll_seconds
+        self.recrawl_interval = settings.queue_recrawl_interval
+
+        # Задачи товаров, которые выполнятся после сохранения их пачки приемником
+        self._uncommitted = 0
+        self._uncommitted_since = 0.0
+        # Сохранение по таймеру и при пустой очереди не должно идти одновременно
+        self._commit_lock = asyncio.Lock()
+
+    async def run(self, base_url: str = "https://moscow.petrovich.ru/catalog/", once: bool = False):
+        """Обрабатывает задачи очереди; с once=True завершается, когда очередь опустела"""
+
+        committer = None
+
+        try:
+            logger.info(f"Запуск воркера {self.queue.worker_id}")
+
+            await mongo_client.connect()
+            await self.queue.ensure_indexes()
+            await self.sink.open()
+
+            await self._seed(base_url)
+
+            committer = asyncio.create_task(self._commit_periodically())
+
+            while True:
+                task = await self.queue.lease()
+
+                if task is None:
+                    # Свои задачи, ждущие записи, тоже числятся арендованными — сначала сохраняем их
+                    await self._commit()
+                    await self.queue.fail_exhausted()
+
+                    if await self.queue.has_unfinished():
+                        # Остались задачи в аренде у других воркеров — они могут породить новые
+                        await asyncio.sleep(self.poll_seconds)
+                        continue
+
+                    if once:
+                        logger.info("Очередь пуста, воркер завершает работу")
+                        break
+
+                    await asyncio.sleep(self.poll_seconds)
+
+                    if await self.queue.recycle(timedelta(seconds=self.recrawl_interval)):
+                        await self._enqueue_categories(base_url)
+                    continue
+
+                await self._run_task(task)
+                await asyncio.sleep(self.delay_between_requests)
+
+        except Exception as e:
+            logger.error(f"Критическая ошибка воркера: {e}")
+        finally:
+            if committer is not None:
+                committer.cancel()
+            await self.sink.close()
+            await mongo_client.disconnect()
+
+    async def _seed(self, base_url: str):
+        """При запуске: начинает новый цикл, если прошлый давно завершен, и добавляет категории"""
+
+        await self.queue.recycle(timedelta(seconds=self.recrawl_interval))
+        await self._enqueue_categories(base_url)
+
+    async def _enqueue_categories(self, base_url: str):
+        # Уже известные категории не дублируются, новые с сайта попадают в текущий цикл
+        categories = await self.start_parser.get_categories(base_url)
+        await self.queue.enqueue_many('category', categories)
+        logger.info(f"Категорий в очереди: {len(categories)}")
+
+    async def _run_task(self, task: Dict[str, Any]):
+        """Выполняет задачу, продлевая аренду, пока она обрабатывается"""
+
+        heartbeat = asyncio.create_task(self._heartbeat(task))
+
+        try:
+            if not await self._handle(task):
+                await self.queue.fail(task, "Обработка не удалась")
+
+            elif task['kind'] == 'product':
+                # Товар может лежать в буфере приемника: задача выполнена, только когда он сохранен
+                self._defer_completion(task)
+
+            else:
+                await self.queue.complete(task)
+
+        except Exception as e:
+            logger.error(f"Ошибка задачи {task['_id']}: {e}")
+            await self.queue.fail(task, str(e))
+
+        finally:
+            heartbeat.cancel()
+
+    def _defer_completion(self, task: Dict[str, Any]):
+        async def complete():
+            await self.queue.complete(task)
+
+        if not self._uncommitted:
+            self._uncommitted_since = time.monotonic()
+        self._uncommitted += 1
+
+        self.sink.on_commit(complete)
+
+    async def _commit(self):
+        """Сохраняет буфер приемника и отмечает выполненными ждавшие его задачи"""
+
+        async with self._commit_lock:
+            # Товары, принятые во время записи, ждут следующего сохранения и снова считаются
+            self._uncommitted = 0
+            await self.sink.commit()
+
+    async def _commit_periodically(self):
+        """Не держит неподтвержденные задачи дольше половины аренды
+
+        Работает по таймеру, а не между задачами: долгая категория или страница
+        не должна задерживать подтверждение уже сохраненных товаров, иначе их аренда истечет.
+        """
+
+        interval = max(1, self.queue.lease_seconds // 4)
+
+        while True:
+            await asyncio.sleep(interval)
+
+            if self._uncommitted and time.monotonic() - self._uncommitted_since >= self.queue.lease_seconds / 2:
+                try:
+                    await self._commit()
+                except Exception as e:
+                    logger.error(f"Ошибка сохранения пачки товаров: {e}")
+
+    async def _handle(self, task: Dict[str, Any]) -> bool:
+        kind, key = task['kind'], task['key']
+        logger.info(f"Задача {kind}: {key} (попытка {task.get('attempts', 1)})")
+
+        if kind == 'category':
+            page_links = await self.category_parser.create_page_links(key)
+            await self.queue.enqueue_many('page', page_links)
+            return True
+
+        if kind == 'page':
+            cards = await self.category_parser.get_product_cards(key)
+            # Карточка едет в задаче товара, чтобы сохранить ее подписи вместе с товаром
+            remaining = await self._apply_cards(cards)
+            await self.queue.enqueue_many(
+                'product',
+                [card.url for card in remaining],
+                {card.url: card.model_dump() for card in remaining}
+            )
+            return True
+
+        if kind == 'product':
+            payload = task.get('payload')
+            return await self._process_product(key, ListingCard(**payload) if payload else None)
+
+        logger.warning(f"Неизвестный тип задачи: {kind}")
+        return False
+
+    async def _heartbeat(self, task: Dict[str, Any]):
+        interval = max(1, self.queue.lease_seconds // 3)
+
+        while True:
+            await asyncio.sleep(interval)
+            if not await self.queue.heartbeat(task):
+                logger.warning(f"Аренда задачи {task['_id']} потеряна")
+                return
\ No newline at end of file
@@ -0,0 +1,82 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, List
+
+from src.schemas.product import ListingCard, Product
+
+logger = logging.getLogger(__name__)
+
+CommitCallback = Callable[[], Awaitable[None]]
+
+
+class ProductSink(ABC):
+    """Базовый приемник результатов парсинга"""
+
+    # Умеет ли приемник хранить подписи карточек и обновлять товары по ним (lookup_cards / write_cards)
+    supports_cards = False
+
+    def __init__(self):
+        self._commit_callbacks: List[CommitCallback] = []
+
+    async def open(self):
+        """Подготавливает приемник к записи"""
+
+    @abstractmethod
+    async def write(self, product: Product):
+        """Принимает один товар"""
+
+    async def write_many(self, products: List[Product]):
+        """Принимает пачку товаров"""
+
+        for product in products:
+            await self.write(product)
+
+    async def lookup_cards(self, product_ids: List[str]) -> Dict[str, Dict[str, str]]:
+        """Возвращает сохраненные подписи карточек {product_id: {card_signature, card_state}}
+
+        Пустой результат означает, что приемник не умеет обновлять товары по карточкам
+        и каждый товар нужно запрашивать через API.
+        """
+
+        return {}
+
+    async def write_cards(self, cards: List[ListingCard]):
+        """Обновляет цены и наличие уже сохраненных товаров по карточкам листинга"""
+
+    def on_commit(self, callback: CommitCallback):
+        """Выполнит callback, когда все уже принятые товары будут надежно сохранены
+
+        Если сохранение не удалось, callback не вызывается.
+        """
+
+        self._commit_callbacks.append(callback)
+
+    async def commit(self):
+        """Сохраняет принятые товары, если приемник это умеет, и выполняет ожидающие callback
+
+        Файловые приемники могут откладывать подтверждение до закрытия.
+        """
+
+        await self.flush()
+
+    async def flush(self):
+        """Сбрасывает накопленные данные"""
+
+        await self._run_commit_callbacks(self._take_commit_callbacks())
+
+    async def close(self):
+        """Сбрасывает остаток и освобождает ресурсы"""
+
+        await self.flush()
+
+    def _take_commit_callbacks(self) -> List[CommitCallback]:
+        # Забираем список вместе с пачкой данных: товары, принятые во время записи, ждут следующей
+        callbacks, self._commit_callbacks = self._commit_callbacks, []
+        return callbacks
+
+    async def _run_commit_callbacks(self, callbacks: List[CommitCallback]):
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"Ошибка обработчика подтверждения записи: {e}")
@@ -0,0 +1,50 @@
+import os
+from datetime import datetime
+from typing import List, Optional
+
+from src.core.settings import settings
+from src.sinks.base import ProductSink
+
+
+def create_sink(names: Optional[List[str]] = None) -> ProductSink:
+    """Создает приемник по списку имен (mongo, jsonl, parquet) из настроек
+
+    Модули приемников импортируются по требованию: запуск с файловыми
+    приемниками не загружает драйвер MongoDB.
+    """
+
+    if names is None:
+        names = [name.strip() for name in settings.output_sinks.split(',') if name.strip()]
+
+    if not names:
+        raise ValueError("Не задан ни один приемник результатов")
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    sinks = []
+
+    for name in names:
+        if name == 'mongo':
+            from src.sinks.mongo_sink import MongoSink
+            sinks.append(MongoSink())
+
+        elif name == 'jsonl':
+            from src.sinks.jsonl_sink import JsonlSink
+            os.makedirs(settings.output_dir, exist_ok=True)
+            extension = JsonlSink.extensions.get(settings.jsonl_compression.lower(), '.jsonl')
+            path = os.path.join(settings.output_dir, f"products_{timestamp}{extension}")
+            sinks.append(JsonlSink(path))
+
+        elif name == 'parquet':
+            from src.sinks.parquet_sink import ParquetSink
+            os.makedirs(settings.output_dir, exist_ok=True)
+            path = os.path.join(settings.output_dir, f"products_{timestamp}.parquet")
+            sinks.append(ParquetSink(path))
+
+        else:
+            raise ValueError(f"Неизвестный приемник результатов: {name}")
+
+    if len(sinks) == 1:
+        return sinks[0]
+
+    from src.sinks.fanout_sink import FanoutSink
+    return FanoutSink(sinks)
@@ -0,0 +1,61 @@
+import asyncio
+from typing import Dict, List
+
+from src.schemas.product import ListingCard, Product
+from src.sinks.base import CommitCallback, ProductSink
+
+
+class FanoutSink(ProductSink):
+    """Отправляет товары сразу в несколько приемников"""
+
+    def __init__(self, sinks: List[ProductSink]):
+        super().__init__()
+        self.sinks = sinks
+        self.supports_cards = all(sink.supports_cards for sink in sinks)
+
+    async def open(self):
+        await asyncio.gather(*(sink.open() for sink in self.sinks))
+
+    async def write(self, product: Product):
+        await asyncio.gather(*(sink.write(product) for sink in self.sinks))
+
+    async def write_many(self, products: List[Product]):
+        await asyncio.gather(*(sink.write_many(products) for sink in self.sinks))
+
+    async def lookup_cards(self, product_ids: List[str]) -> Dict[str, Dict[str, str]]:
+        # Обновление по карточке возможно, только если его умеют применить все приемники
+        results = await asyncio.gather(*(sink.lookup_cards(product_ids) for sink in self.sinks))
+
+        known = results[0]
+        for result in results[1:]:
+            known = {product_id: state for product_id, state in known.items() if result.get(product_id) == state}
+        return known
+
+    async def write_cards(self, cards: List[ListingCard]):
+        await asyncio.gather(*(sink.write_cards(cards) for sink in self.sinks))
+
+    def on_commit(self, callback: CommitCallback):
+        # Товар сохранен, только когда его подтвердили все приемники
+        remaining = len(self.sinks)
+
+        async def confirm():
+            nonlocal remaining
+            remaining -= 1
+            if remaining == 0:
+                await callback()
+
+        for sink in self.sinks:
+            sink.on_commit(confirm)
+
+    async def commit(self):
+        await asyncio.gather(*(sink.commit() for sink in self.sinks))
+
+    async def flush(self):
+        await asyncio.gather(*(sink.flush() for sink in self.sinks))
+
+    async def close(self):
+        # Закрываем все приемники, даже если какой-то из них упал
+        results = await asyncio.gather(*(sink.close() for sink in self.sinks), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
@@ -0,0 +1,64 @@
+import gzip
+import json
+import logging
+from typing import Optional
+
+from src.core.settings import settings
+from src.schemas.product import Product
+from src.sinks.base import ProductSink
+
+logger = logging.getLogger(__name__)
+
+
+class JsonlSink(ProductSink):
+    """Потоковая запись товаров в JSON Lines с необязательным сжатием gzip / zstd"""
+
+    extensions = {'': '.jsonl', 'gzip': '.jsonl.gz', 'zstd': '.jsonl.zst'}
+
+    def __init__(self, path: str, compression: Optional[str] = None, batch_size: Optional[int] = None):
+        self.compression = (settings.jsonl_compression if compression is None else compression).lower()
+        if self.compression not in self.extensions:
+            raise ValueError(f"Неизвестный тип сжатия JSONL: {self.compression}")
+
+        super().__init__()
+        self.path = path
+        self.batch_size = batch_size or settings.sink_batch_size
+        self._file = None
+        self._unflushed = 0
+
+    async def open(self):
+        if self.compression == 'gzip':
+            self._file = gzip.open(self.path, 'wb')
+        elif self.compression == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                raise RuntimeError("Для сжатия zstd установите пакет zstandard")
+
+            self._file = zstandard.ZstdCompressor().stream_writer(open(self.path, 'wb'), closefd=True)
+        else:
+            self._file = open(self.path, 'wb')
+
+        logger.info(f"Запись JSONL: {self.path}")
+
+    async def write(self, product: Product):
+        line = json.dumps(product.model_dump(mode='json'), ensure_ascii=False) + '\n'
+        self._file.write(line.encode('utf-8'))
+
+        # Периодически сбрасываем буфер файла и подтверждаем записанное
+        self._unflushed += 1
+        if self._unflushed >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        if self._file:
+            self._file.flush()
+        self._unflushed = 0
+        await super().flush()
+
+    async def close(self):
+        if self._file:
+            # Закрытие сжимающего потока дописывает его хвост и закрывает файл
+            self._file.close()
+            self._file = None
+            await self._run_commit_callbacks(self._take_commit_callbacks())
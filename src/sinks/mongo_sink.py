@@ -0,0 +1,58 @@
+import logging
+from typing import Dict, List, Optional
+
+from src.core.settings import settings
+from src.repository.mongo_client import mongo_client
+from src.repository.repository import ProductRepository
+from src.schemas.product import ListingCard, Product
+from src.sinks.base import ProductSink
+
+logger = logging.getLogger(__name__)
+
+
+class MongoSink(ProductSink):
+    """Запись товаров в MongoDB пачками через bulk_write"""
+
+    supports_cards = True
+
+    def __init__(self, batch_size: Optional[int] = None):
+        super().__init__()
+        self.repository = ProductRepository()
+        self.batch_size = batch_size or settings.sink_batch_size
+        self._buffer: List[Product] = []
+
+    async def open(self):
+        await mongo_client.connect()
+        await self.repository.ensure_indexes()
+
+    async def write(self, product: Product):
+        self._buffer.append(product)
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+
+    async def write_many(self, products: List[Product]):
+        self._buffer.extend(products)
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+
+    async def lookup_cards(self, product_ids: List[str]) -> Dict[str, Dict[str, str]]:
+        return await self.repository.get_card_states(product_ids)
+
+    async def write_cards(self, cards: List[ListingCard]):
+        await self.repository.update_from_cards(cards)
+
+    async def flush(self):
+        batch, self._buffer = self._buffer, []
+        callbacks = self._take_commit_callbacks()
+
+        if batch and not await self.repository.save_products(batch):
+            logger.warning(f"Пакет из {len(batch)} товаров не сохранен, подтверждения записи отменены")
+            return
+
+        await self._run_commit_callbacks(callbacks)
+
+    async def close(self):
+        try:
+            await self.flush()
+        finally:
+            await mongo_client.disconnect()
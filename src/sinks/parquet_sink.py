@@ -0,0 +1,157 @@
+import os
+import logging
+from typing import Any, Dict, List, Optional
+
+from src.core.settings import settings
+from src.schemas.product import Product
+from src.sinks.base import ProductSink
+
+logger = logging.getLogger(__name__)
+
+
+def _product_schema(pa):
+    """Колоночная схема Product со вложенными атрибутами и поставщиками"""
+
+    price = pa.struct([
+        ('qnt', pa.int64()),
+        ('discount', pa.float64()),
+        ('price', pa.float64()),
+    ])
+    offer = pa.struct([
+        ('price', pa.list_(price)),
+        ('stock', pa.string()),
+        ('delivery_time', pa.string()),
+        ('package_info', pa.string()),
+        ('purchase_url', pa.string()),
+    ])
+    supplier = pa.struct([
+        ('dealer_id', pa.string()),
+        ('supplier_name', pa.string()),
+        ('supplier_tel', pa.string()),
+        ('supplier_address', pa.string()),
+        ('supplier_description', pa.string()),
+        ('supplier_offers', pa.list_(offer)),
+    ])
+    # Значения атрибута разделены по типам: числа и строки в отдельных колонках
+    attribute = pa.struct([
+        ('slug', pa.string()),
+        ('name', pa.string()),
+        ('unit', pa.string()),
+        ('numbers', pa.list_(pa.float64())),
+        ('texts', pa.list_(pa.string())),
+    ])
+
+    return pa.schema([
+        ('title', pa.string()),
+        ('description', pa.string()),
+        ('article', pa.string()),
+        ('brand', pa.string()),
+        ('country_of_origin', pa.string()),
+        ('warranty_months', pa.string()),
+        ('category', pa.string()),
+        ('created_at', pa.string()),
+        ('updated_at', pa.timestamp('us', tz='UTC')),
+        ('attributes', pa.list_(attribute)),
+        ('suppliers', pa.list_(supplier)),
+    ])
+
+
+class ParquetSink(ProductSink):
+    """Запись товаров в Parquet группами строк (row groups)
+
+    Файл Parquet читается только после записи футера, поэтому commit закрывает
+    текущую часть (products_..-00000.parquet) и подтверждает записанное; следующая
+    часть открывается при следующей записи группы строк.
+    """
+
+    def __init__(self, path: str, row_group_size: Optional[int] = None, part_row_groups: Optional[int] = None):
+        super().__init__()
+        self.path = path
+        self.row_group_size = row_group_size or settings.parquet_row_group_size
+        self.part_row_groups = part_row_groups or settings.parquet_part_row_groups
+
+        self._rows: List[Dict[str, Any]] = []
+        self._writer = None
+        self._part = 0
+        self._part_row_groups = 0
+        self._pa = None
+        self._parquet = None
+        self._schema = None
+
+    async def open(self):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Для записи Parquet установите пакет pyarrow")
+
+        self._pa = pyarrow
+        self._parquet = pyarrow.parquet
+        self._schema = _product_schema(pyarrow)
+
+        logger.info(f"Запись Parquet: {self._part_path('*')}")
+
+    async def write(self, product: Product):
+        self._rows.append(self._row(product))
+        if len(self._rows) >= self.row_group_size:
+            await self.flush()
+
+    def _row(self, product: Product) -> Dict[str, Any]:
+        row = product.model_dump()
+
+        attributes = []
+        for attribute in row['attributes']:
+            values = attribute['value'] if isinstance(attribute['value'], list) else [attribute['value']]
+            attributes.append({
+                'slug': attribute['slug'],
+                'name': attribute['name'],
+                'unit': attribute['unit'],
+                'numbers': [value for value in values if isinstance(value, float)],
+                'texts': [value for value in values if isinstance(value, str)],
+            })
+        row['attributes'] = attributes
+
+        return row
+
+    async def commit(self):
+        await self.flush()
+        self._close_part()
+
+        # Все принятые товары теперь в закрытых частях
+        await self._run_commit_callbacks(self._take_commit_callbacks())
+
+    async def flush(self):
+        if not self._rows or not self._schema:
+            return
+
+        if self._writer is None:
+            path = self._part_path(f"{self._part:05d}")
+            self._writer = self._parquet.ParquetWriter(path, self._schema, compression='zstd')
+
+        # Каждая пачка становится отдельной группой строк
+        table = self._pa.Table.from_pylist(self._rows, schema=self._schema)
+        self._writer.write_table(table, row_group_size=len(self._rows))
+        self._rows = []
+        self._part_row_groups += 1
+
+        # Долгий обход без commit (полный обход, планировщик) не держит весь файл без футера
+        if self._part_row_groups >= self.part_row_groups:
+            self._close_part()
+            await self._run_commit_callbacks(self._take_commit_callbacks())
+
+    async def close(self):
+        await self.commit()
+
+    def _part_path(self, suffix: str) -> str:
+        base, extension = os.path.splitext(self.path)
+        return f"{base}-{suffix}{extension}"
+
+    def _close_part(self):
+        if self._writer is None:
+            return
+
+        self._writer.close()
+        self._writer = None
+        self._part_row_groups = 0
+        logger.info(f"Часть Parquet записана: {self._part_path(f'{self._part:05d}')}")
+        self._part += 1